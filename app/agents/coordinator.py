@@ -107,7 +107,7 @@ class CoordinatorAgent(BaseAgent):
         if not matches:
             return None
             
-        logger.debug(f"Keyword matches: {matches}")
+        logger.debug("Keyword matches: %s", matches)
         
         # If ML prediction has keyword matches, prefer it (confirms the prediction)
         if ml_prediction and ml_prediction in matches:
@@ -116,7 +116,7 @@ class CoordinatorAgent(BaseAgent):
         
         # Otherwise, return the department with the most keyword matches
         best_dept = max(matches.keys(), key=lambda d: len(matches[d]))
-        logger.debug(f"Selected '{best_dept}' based on keyword count")
+        logger.debug("Selected '%s' based on keyword count", best_dept)
         return best_dept
     
     def get_routing_decision(
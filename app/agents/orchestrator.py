@@ -394,7 +394,7 @@ class OnboardingOrchestrator:
                     confidence_score=confidence
                 )
                 db.close()
-                logger.debug(f"Cached response for query: {query[:50]}...")
+                logger.debug("Cached response for query: %.50s...", query)
             except Exception as e:
                 logger.warning(f"Failed to cache response: {e}")
         
@@ -1,9 +1,10 @@
 """Authentication API routes."""
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 
 from app.database import get_db, User
@@ -158,9 +159,23 @@ async def login(
         user, ip_address, user_agent
     )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    user.failed_login_attempts = 0
+    # Update last login and the consecutive-day login streak
+    now = datetime.utcnow()
+    today = now.date()
+    db.execute(
+        update(User)
+        .where(User.id == user.id)
+        .values(
+            last_login=now,
+            failed_login_attempts=0,
+            login_streak_days=case(
+                (User.last_login_date == today, User.login_streak_days),
+                (User.last_login_date == today - timedelta(days=1), User.login_streak_days + 1),
+                else_=1
+            ),
+            last_login_date=today
+        )
+    )
     db.commit()
     
     # Log successful login
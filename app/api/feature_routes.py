@@ -8,7 +8,7 @@ from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_db, strict_load
 from app.database.models import (
     User, FAQ, Department, FeedbackType, AuditLog,
     Achievement, TrainingModule, CalendarEvent, Workflow,
@@ -674,7 +674,7 @@ async def get_audit_logs(
     current_user: User = Depends(get_current_active_user)
 ):
     """Get audit logs with filtering (admin only)."""
-    query = db.query(AuditLog)
+    query = strict_load(db.query(AuditLog))
     
     if action:
         query = query.filter(AuditLog.action.ilike(f"%{action}%"))
@@ -7,7 +7,8 @@ from starlette.requests import Request
 from starlette.responses import Response, JSONResponse
 
 from app.security import check_rate_limit, redact_pii, get_pii_detector
-from app.monitoring import get_metrics_collector
+from app.monitoring import record_request
+from app.monitoring.events import submit_event
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,6 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             Response after processing.
         """
         start_time = time.time()
-        metrics = get_metrics_collector()
         
         # Extract user identifier for rate limiting
         # Try to get user_id from headers or use IP address
@@ -65,11 +65,12 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             
             # Record metrics
             elapsed = time.time() - start_time
-            metrics.record_request(
-                endpoint=request.url.path,
-                method=request.method,
-                status=response.status_code,
-                latency_seconds=elapsed
+            submit_event(
+                record_request,
+                request.url.path,
+                request.method,
+                response.status_code,
+                elapsed
             )
             
             # Add security headers
@@ -81,11 +82,12 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             
         except Exception as e:
             elapsed = time.time() - start_time
-            metrics.record_request(
-                endpoint=request.url.path,
-                method=request.method,
-                status=500,
-                latency_seconds=elapsed
+            submit_event(
+                record_request,
+                request.url.path,
+                request.method,
+                500,
+                elapsed
             )
             logger.error(f"Request error: {e}")
             raise
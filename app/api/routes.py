@@ -6,11 +6,11 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, insert, update
 
 from app.config import get_settings
-from app.database import get_db, User, Task, Message, RoutingLog, AgentCallLog
-from app.database.models import TaskStatus as DBTaskStatus, Department as DBDepartment, UserRole
+from app.database import get_db, get_bulk_writer, strict_load, User, Task, Message, RoutingLog, AgentCallLog
+from app.database.models import TaskStatus as DBTaskStatus, Department as DBDepartment, UserRole, MessageRedaction
 from app.api.schemas import (
     UserCreate, UserResponse, UserWithProgress, UserProgressStats,
     TaskCreate, TaskResponse, TaskStatusUpdate, TaskWithOverdue,
@@ -127,7 +127,7 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     
     # Calculate progress
-    tasks = db.query(Task).filter(Task.user_id == user_id).all()
+    tasks = strict_load(db.query(Task)).filter(Task.user_id == user_id).all()
     total = len(tasks)
     completed = len([t for t in tasks if t.status == DBTaskStatus.DONE])
     overdue = len([t for t in tasks if t.due_date < date.today() and t.status != DBTaskStatus.DONE])
@@ -157,7 +157,7 @@ async def get_tasks(
     db: Session = Depends(get_db)
 ):
     """Get tasks for a user."""
-    query = db.query(Task).filter(Task.user_id == user_id)
+    query = strict_load(db.query(Task)).filter(Task.user_id == user_id)
     
     if status:
         query = query.filter(Task.status == DBTaskStatus(status))
@@ -232,30 +232,37 @@ def _save_user_message_background(db_session_factory, user_id: int, request_mess
         
         redacted_message = redact_pii(request_message)
         
-        # Save user message
-        user_message = Message(
+        # Save user message (write-only rows: Core INSERTs, no ORM objects)
+        inserted = db.execute(insert(Message.__table__).values(
             user_id=user_id,
             text=request_message,
-            text_redacted=redacted_message,
             source="user"
+        ))
+        db.execute(insert(MessageRedaction.__table__), [{
+            "message_id": inserted.inserted_primary_key[0],
+            "text_redacted": redacted_message
+        }])
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(questions_asked_count=User.questions_asked_count + 1)
         )
-        db.add(user_message)
-        
-        # Save routing log
-        routing = result.get("routing", {})
-        routing_log = RoutingLog(
-            user_id=user_id,
-            query_text=request_message,
-            query_text_redacted=redacted_message,
-            predicted_department=routing.get("predicted_department", "General"),
-            prediction_confidence=routing.get("prediction_confidence", 0.0),
-            final_department=routing.get("final_department", "General"),
-            was_overridden=routing.get("was_overridden", False)
-        )
-        db.add(routing_log)
         
         db.commit()
         db.close()
+        
+        # Queue routing log for the next batched insert
+        routing = result.get("routing", {})
+        get_bulk_writer().add(RoutingLog.__table__, {
+            "user_id": user_id,
+            "query_text": request_message,
+            "query_text_redacted": redacted_message,
+            "predicted_department": routing.get("predicted_department", "General"),
+            "prediction_confidence": routing.get("prediction_confidence", 0.0),
+            "final_department": routing.get("final_department", "General"),
+            "was_overridden": routing.get("was_overridden", False),
+            "timestamp": datetime.utcnow()
+        })
     except Exception as e:
         logger.error(f"Background user message save failed: {e}")
 
@@ -288,7 +295,8 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
         return db.query(Task).filter(Task.user_id == request.user_id).all()
     
     def get_messages():
-        return db.query(Message).filter(
+        # Only the columns the chat history needs, not full ORM rows
+        return db.query(Message.source, Message.text).filter(
             Message.user_id == request.user_id
         ).order_by(Message.timestamp.desc()).limit(10).all()
     
@@ -340,23 +348,34 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
                     task.completed_at = datetime.utcnow()
     
     # Save assistant message SYNCHRONOUSLY to get the message_id for feedback
-    # This is required for the feedback system to work
-    assistant_message = Message(
+    # This is required for the feedback system to work. A Core INSERT returns
+    # the new id directly, without an ORM flush or a refresh SELECT.
+    inserted = db.execute(insert(Message.__table__).values(
         user_id=user.id,
         text=result["response"],
-        text_redacted=result["response"],
         source="assistant",
         extra_data={
             "agent": result.get("agent"),
             "routing": result.get("routing")
         }
-    )
-    db.add(assistant_message)
+    ))
     db.commit()
-    db.refresh(assistant_message)
     
     # Get the message_id for frontend feedback
-    saved_message_id = assistant_message.id
+    saved_message_id = inserted.inserted_primary_key[0]
+    
+    # Queue the agent call log for the next batched insert
+    sources_used = result.get("sources", [])
+    get_bulk_writer().add(AgentCallLog.__table__, {
+        "user_id": user.id,
+        "message_id": saved_message_id,
+        "agent_name": result.get("agent") or "unknown",
+        "retrieval_k": len(sources_used),
+        "retrieval_docs": [s.get("document", "") for s in sources_used],
+        "total_time_ms": result.get("total_time_ms", 0),
+        "error": result.get("error"),
+        "timestamp": datetime.utcnow()
+    })
     
     # Save user message and routing log in background (non-blocking)
     _background_executor.submit(
@@ -442,12 +461,12 @@ async def ask_faq(topic_id: str, user_id: int, db: Session = Depends(get_db)):
 @router.get("/admin/users", response_model=List[UserProgressStats], tags=["Admin"])
 async def get_all_users_progress(db: Session = Depends(get_db)):
     """Get all users with progress stats (admin only)."""
-    users = db.query(User).filter(User.user_type == UserRole.NEW_HIRE).all()
+    users = strict_load(db.query(User)).filter(User.user_type == UserRole.NEW_HIRE).all()
     today = date.today()
     
     results = []
     for user in users:
-        tasks = db.query(Task).filter(Task.user_id == user.id).all()
+        tasks = strict_load(db.query(Task)).filter(Task.user_id == user.id).all()
         total = len(tasks)
         completed = len([t for t in tasks if t.status == DBTaskStatus.DONE])
         overdue = len([t for t in tasks if t.due_date < today and t.status != DBTaskStatus.DONE])
@@ -11,10 +11,24 @@ import structlog
 
 from app.audit.service import AuditLogger, AuditAction, AuditResource
 from app.database import SessionLocal
+from app.monitoring.events import submit_event
 
 logger = structlog.get_logger()
 
 
+def _write_audit_entry(**entry) -> None:
+    """Persist one request's audit entry (runs on the background event queue)."""
+    db = None
+    try:
+        db = SessionLocal()
+        AuditLogger(db).log(**entry)
+    except Exception as e:
+        logger.error("audit_log_failed", error=str(e))
+    finally:
+        if db:
+            db.close()
+
+
 class AuditMiddleware(BaseHTTPMiddleware):
     """
     Middleware that automatically logs all API requests for audit purposes.
@@ -120,28 +134,20 @@ class AuditMiddleware(BaseHTTPMiddleware):
             else:
                 audit_status = "error"
             
-            # Log audit entry - use database session for persistence
-            db = None
-            try:
-                db = SessionLocal()
-                audit_logger = AuditLogger(db)
-                audit_logger.log(
-                    action=action,
-                    resource_type=resource_type,
-                    user_id=user_id,
-                    user_email=user_email,
-                    session_id=session_id,
-                    ip_address=client_ip,
-                    user_agent=user_agent,
-                    details=details,
-                    status=audit_status,
-                    error_message=error_message,
-                )
-            except Exception as e:
-                logger.error("audit_log_failed", error=str(e))
-            finally:
-                if db:
-                    db.close()
+            # Log audit entry off the request path
+            submit_event(
+                _write_audit_entry,
+                action=action,
+                resource_type=resource_type,
+                user_id=user_id,
+                user_email=user_email,
+                session_id=session_id,
+                ip_address=client_ip,
+                user_agent=user_agent,
+                details=details,
+                status=audit_status,
+                error_message=error_message,
+            )
             
             # Log request completion
             logger.info(
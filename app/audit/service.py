@@ -137,29 +137,19 @@ class AuditLogger:
         
         # Log to database if available
         if self.db:
-            self._log_to_database(audit_entry)
+            self._log_to_database({**audit_entry, "timestamp": timestamp})
     
     def _log_to_database(self, audit_entry: Dict[str, Any]) -> None:
-        """Log audit entry to database."""
+        """Log audit entry to database.
+        
+        Audit rows are write-only, so they are queued on the bulk writer and
+        inserted in batches instead of going through the ORM unit of work.
+        """
         try:
+            from app.database.bulk_writer import get_bulk_writer
             from app.database.models import AuditLog
             
-            db_entry = AuditLog(
-                action=audit_entry["action"],
-                resource_type=audit_entry["resource_type"],
-                resource_id=audit_entry.get("resource_id"),
-                user_id=audit_entry.get("user_id"),
-                user_email=audit_entry.get("user_email"),
-                session_id=audit_entry.get("session_id"),
-                ip_address=audit_entry.get("ip_address"),
-                user_agent=audit_entry.get("user_agent"),
-                details=audit_entry.get("details"),
-                status=audit_entry["status"],
-                error_message=audit_entry.get("error_message"),
-                timestamp=datetime.fromisoformat(audit_entry["timestamp"])
-            )
-            self.db.add(db_entry)
-            self.db.commit()
+            get_bulk_writer().add(AuditLog.__table__, audit_entry)
         except Exception as e:
             logger.error("failed_to_log_audit_to_db", error=str(e))
     
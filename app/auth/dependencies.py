@@ -154,7 +154,7 @@ def require_permissions(*required_permissions: Permission) -> Callable:
     async def permission_checker(current_user: User = Depends(get_current_active_user)) -> User:
         rbac = get_rbac_service()
         
-        if not rbac.has_all_permissions(current_user.user_type.value, list(required_permissions)):
+        if not rbac.has_all_permissions(current_user.user_type.value, required_permissions):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied. Required permissions: {', '.join(p.value for p in required_permissions)}"
@@ -171,7 +171,7 @@ def require_any_permission(*required_permissions: Permission) -> Callable:
     async def permission_checker(current_user: User = Depends(get_current_active_user)) -> User:
         rbac = get_rbac_service()
         
-        if not rbac.has_any_permission(current_user.user_type.value, list(required_permissions)):
+        if not rbac.has_any_permission(current_user.user_type.value, required_permissions):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access denied. Need at least one of: {', '.join(p.value for p in required_permissions)}"
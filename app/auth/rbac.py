@@ -1,11 +1,14 @@
 """Role-Based Access Control (RBAC) system."""
 import logging
 from enum import Enum
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, FrozenSet, Iterable, Optional, Set, Tuple
 from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Unknown roles already reported, so repeated bad requests don't flood the log
+_WARNED_UNKNOWN_ROLES: Set[str] = set()
+
 
 class Permission(str, Enum):
     """System permissions."""
@@ -54,24 +57,24 @@ class Role(str, Enum):
 
 
 # Role-Permission mapping
-ROLE_PERMISSIONS: Dict[Role, Set[Permission]] = {
-    Role.NEW_HIRE: {
+ROLE_PERMISSIONS: Dict[Role, FrozenSet[Permission]] = {
+    Role.NEW_HIRE: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.TASK_READ_OWN,
         Permission.TASK_UPDATE_OWN,
         Permission.USER_READ_OWN,
         Permission.USER_UPDATE_OWN,
-    },
-    Role.EMPLOYEE: {
+    }),
+    Role.EMPLOYEE: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.TASK_READ_OWN,
         Permission.TASK_UPDATE_OWN,
         Permission.USER_READ_OWN,
         Permission.USER_UPDATE_OWN,
-    },
-    Role.MANAGER: {
+    }),
+    Role.MANAGER: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.CHAT_READ_ALL,  # Can view team chats
@@ -82,8 +85,8 @@ ROLE_PERMISSIONS: Dict[Role, Set[Permission]] = {
         Permission.USER_UPDATE_OWN,
         Permission.USER_READ_ALL,  # Can view team members
         Permission.ADMIN_DASHBOARD,
-    },
-    Role.HR_ADMIN: {
+    }),
+    Role.HR_ADMIN: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.CHAT_READ_ALL,
@@ -99,8 +102,8 @@ ROLE_PERMISSIONS: Dict[Role, Set[Permission]] = {
         Permission.USER_UPDATE_ALL,
         Permission.ADMIN_DASHBOARD,
         Permission.ADMIN_METRICS,
-    },
-    Role.IT_ADMIN: {
+    }),
+    Role.IT_ADMIN: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.TASK_READ_OWN,
@@ -110,8 +113,8 @@ ROLE_PERMISSIONS: Dict[Role, Set[Permission]] = {
         Permission.ADMIN_DASHBOARD,
         Permission.ADMIN_LOGS,
         Permission.SYSTEM_CONFIG,
-    },
-    Role.SECURITY_ADMIN: {
+    }),
+    Role.SECURITY_ADMIN: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.CHAT_READ_ALL,
@@ -123,8 +126,8 @@ ROLE_PERMISSIONS: Dict[Role, Set[Permission]] = {
         Permission.ADMIN_DASHBOARD,
         Permission.ADMIN_LOGS,
         Permission.ADMIN_AUDIT,
-    },
-    Role.ADMIN: {
+    }),
+    Role.ADMIN: frozenset({
         Permission.CHAT_SEND,
         Permission.CHAT_READ_OWN,
         Permission.CHAT_READ_ALL,
@@ -144,8 +147,15 @@ ROLE_PERMISSIONS: Dict[Role, Set[Permission]] = {
         Permission.ADMIN_METRICS,
         Permission.ADMIN_LOGS,
         Permission.ADMIN_AUDIT,
-    },
-    Role.SUPER_ADMIN: set(Permission),  # All permissions
+    }),
+    Role.SUPER_ADMIN: frozenset(Permission),  # All permissions
+}
+
+
+# Permission strings per role, precomputed for token and session payloads
+ROLE_PERMISSION_STRINGS: Dict[Role, Tuple[str, ...]] = {
+    role: tuple(sorted(p.value for p in permissions))
+    for role, permissions in ROLE_PERMISSIONS.items()
 }
 
 
@@ -155,30 +165,33 @@ class RBACService:
     def __init__(self):
         self.role_permissions = ROLE_PERMISSIONS
     
-    def get_role_permissions(self, role: str) -> Set[Permission]:
+    def get_role_permissions(self, role: str) -> FrozenSet[Permission]:
         """Get all permissions for a role."""
         try:
             role_enum = Role(role)
-            return self.role_permissions.get(role_enum, set())
+            return self.role_permissions.get(role_enum, frozenset())
         except ValueError:
             # Unknown role, return minimal permissions
-            logger.warning(f"Unknown role: {role}, returning minimal permissions")
-            return self.role_permissions.get(Role.NEW_HIRE, set())
+            if role not in _WARNED_UNKNOWN_ROLES:
+                _WARNED_UNKNOWN_ROLES.add(role)
+                logger.warning("Unknown role: %s, returning minimal permissions", role)
+            return self.role_permissions.get(Role.NEW_HIRE, frozenset())
     
     def has_permission(self, user_role: str, permission: Permission) -> bool:
         """Check if a role has a specific permission."""
         permissions = self.get_role_permissions(user_role)
         return permission in permissions
     
-    def has_any_permission(self, user_role: str, permissions: List[Permission]) -> bool:
+    def has_any_permission(self, user_role: str, permissions: Iterable[Permission]) -> bool:
         """Check if a role has any of the specified permissions."""
         user_permissions = self.get_role_permissions(user_role)
-        return bool(user_permissions.intersection(set(permissions)))
+        # Short-circuits on the first hit without building an intermediate set
+        return any(p in user_permissions for p in permissions)
     
-    def has_all_permissions(self, user_role: str, permissions: List[Permission]) -> bool:
+    def has_all_permissions(self, user_role: str, permissions: Iterable[Permission]) -> bool:
         """Check if a role has all of the specified permissions."""
         user_permissions = self.get_role_permissions(user_role)
-        return set(permissions).issubset(user_permissions)
+        return all(p in user_permissions for p in permissions)
     
     def get_permission_list(self, role: str) -> List[str]:
         """Get list of permission strings for a role."""
@@ -2,16 +2,24 @@
 import logging
 import secrets
 import hashlib
+import hmac
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
-from functools import lru_cache
+from functools import lru_cache, partial
 
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
 from passlib.context import CryptContext
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.auth.rbac import get_rbac_service
+from app.auth.rbac import get_rbac_service, ROLE_PERMISSION_STRINGS
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -24,6 +32,21 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# 192 bits of entropy for refresh-token jti (32 url-safe chars)
+JTI_BYTES = 24
+
+# Refresh-token fingerprints are 32 bytes, matching UserSession.refresh_token_hash
+TOKEN_HASH_BYTES = 32
+
+# Role-derived JWT claims, shared by every user with that role
+ROLE_TOKEN_TEMPLATE: Dict[str, Dict[str, Any]] = {
+    role.value: {"user_type": role.value, "permissions": list(strings)}
+    for role, strings in ROLE_PERMISSION_STRINGS.items()
+}
+
+# Key for refresh-token fingerprints stored in the session cache
+_TOKEN_HASH_KEY = settings.secret_key.encode("utf-8")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password."""
@@ -61,7 +84,7 @@ def create_refresh_token(
         "exp": expire,
         "type": "refresh",
         "iat": datetime.utcnow(),
-        "jti": secrets.token_urlsafe(32)  # Unique token ID for revocation
+        "jti": secrets.token_urlsafe(JTI_BYTES)  # Unique token ID for revocation
     })
     return jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
 
@@ -76,84 +99,312 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _hash_token(token: str) -> str:
+    """Fingerprint a token with a keyed BLAKE2b-256 HMAC.
+    
+    Hex-encoded so the value round-trips through the JSON payload of the
+    Redis session backend unchanged; ``bytes.fromhex`` gives the raw
+    digest for the binary ``UserSession.refresh_token_hash`` column.
+    """
+    digestmod = partial(hashlib.blake2b, digest_size=TOKEN_HASH_BYTES)
+    return hmac.new(_TOKEN_HASH_KEY, token.encode("utf-8"), digestmod).hexdigest()
+
+
 def generate_session_id() -> str:
-    """Generate a unique session ID."""
-    return secrets.token_urlsafe(32)
+    """Generate a unique session ID (a random UUID, matching AuditLog.session_id)."""
+    return str(uuid.uuid4())
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """A cached session payload and its expiry as a Unix timestamp."""
+    expires_at: float
+    data: Dict[str, Any]
 
 
 class SessionCache:
-    """In-memory session cache with TTL."""
+    """In-memory session cache with TTL.
+    
+    Mutations are serialized with an ``RLock``; ``get`` reads without the
+    lock and only acquires it to evict an expired entry.
+    """
     
     def __init__(self, default_ttl: int = 3600):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: Dict[str, _CacheEntry] = {}
         self._default_ttl = default_ttl
+        self._lock = threading.RLock()
     
     def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
         """Set a session in cache."""
-        expiry = datetime.utcnow() + timedelta(seconds=ttl or self._default_ttl)
-        self._cache[key] = {
-            "data": value,
-            "expires_at": expiry
-        }
+        entry = _CacheEntry(
+            expires_at=time.time() + (ttl or self._default_ttl),
+            data=value
+        )
+        with self._lock:
+            self._cache[key] = entry
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """Get a session from cache."""
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
             return None
         
-        entry = self._cache[key]
-        if datetime.utcnow() > entry["expires_at"]:
-            del self._cache[key]
+        if time.time() > entry.expires_at:
+            with self._lock:
+                # Only evict if the entry wasn't replaced in the meantime
+                if self._cache.get(key) is entry:
+                    del self._cache[key]
             return None
         
-        return entry["data"]
+        return entry.data
     
     def delete(self, key: str) -> bool:
         """Delete a session from cache."""
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        with self._lock:
+            return self._cache.pop(key, None) is not None
     
     def delete_user_sessions(self, user_id: int) -> int:
         """Delete all sessions for a user."""
-        to_delete = [
-            key for key, entry in self._cache.items()
-            if entry["data"].get("user_id") == user_id
-        ]
-        for key in to_delete:
-            del self._cache[key]
-        return len(to_delete)
+        with self._lock:
+            to_delete = [
+                key for key, entry in self._cache.items()
+                if entry.data.get("user_id") == user_id
+            ]
+            for key in to_delete:
+                del self._cache[key]
+            return len(to_delete)
     
     def update_activity(self, key: str) -> bool:
         """Update last activity timestamp for a session."""
-        if key in self._cache:
-            self._cache[key]["data"]["last_activity"] = datetime.utcnow()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False
+            entry.data["last_activity"] = datetime.utcnow()
             return True
-        return False
     
     def cleanup_expired(self) -> int:
         """Remove expired sessions."""
-        now = datetime.utcnow()
-        expired = [key for key, entry in self._cache.items() if now > entry["expires_at"]]
-        for key in expired:
-            del self._cache[key]
-        return len(expired)
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._cache.items() if now > entry.expires_at]
+            for key in expired:
+                del self._cache[key]
+            return len(expired)
+    
+    def get_user_sessions(self, user_id: int) -> list:
+        """Get all active sessions for a user."""
+        sessions = []
+        now = time.time()
+        with self._lock:
+            for key, entry in self._cache.items():
+                if entry.data.get("user_id") == user_id and now <= entry.expires_at:
+                    session_data = entry.data.copy()
+                    session_data["session_id"] = key
+                    sessions.append(session_data)
+        return sessions
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize datetimes as ISO strings for the Redis session payload."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class RedisSessionCache:
+    """Redis-backed session cache shared across workers.
+    
+    Sessions are stored as JSON under ``sess:{session_id}`` with a native
+    Redis TTL, and indexed per user in a ``user_sess:{user_id}`` set so that
+    user-wide lookups and logouts don't need to scan the keyspace.
+    """
+    
+    SESSION_PREFIX = "sess:"
+    USER_PREFIX = "user_sess:"
+    
+    def __init__(self, redis_url: str, default_ttl: int = 3600):
+        import redis
+        
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._default_ttl = default_ttl
+    
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Set a session in cache."""
+        ttl = ttl or self._default_ttl
+        pipe = self._redis.pipeline()
+        pipe.setex(f"{self.SESSION_PREFIX}{key}", ttl, json.dumps(value, default=_json_default))
+        user_id = value.get("user_id")
+        if user_id is not None:
+            user_key = f"{self.USER_PREFIX}{user_id}"
+            pipe.sadd(user_key, key)
+            pipe.expire(user_key, ttl)
+        pipe.execute()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a session from cache."""
+        raw = self._redis.get(f"{self.SESSION_PREFIX}{key}")
+        if raw is None:
+            return None
+        return json.loads(raw)
+    
+    def delete(self, key: str) -> bool:
+        """Delete a session from cache."""
+        return bool(self._redis.delete(f"{self.SESSION_PREFIX}{key}"))
+    
+    def delete_user_sessions(self, user_id: int) -> int:
+        """Delete all sessions for a user."""
+        user_key = f"{self.USER_PREFIX}{user_id}"
+        session_ids = self._redis.smembers(user_key)
+        if not session_ids:
+            return 0
+        
+        pipe = self._redis.pipeline()
+        for session_id in session_ids:
+            pipe.delete(f"{self.SESSION_PREFIX}{session_id}")
+        pipe.delete(user_key)
+        results = pipe.execute()
+        return sum(results[:-1])
+    
+    def update_activity(self, key: str) -> bool:
+        """Update last activity timestamp for a session."""
+        session_key = f"{self.SESSION_PREFIX}{key}"
+        raw = self._redis.get(session_key)
+        if raw is None:
+            return False
+        
+        data = json.loads(raw)
+        data["last_activity"] = datetime.utcnow()
+        # keepttl preserves the expiry set at login/refresh
+        return bool(self._redis.set(
+            session_key,
+            json.dumps(data, default=_json_default),
+            keepttl=True,
+            xx=True
+        ))
     
     def get_user_sessions(self, user_id: int) -> list:
         """Get all active sessions for a user."""
+        user_key = f"{self.USER_PREFIX}{user_id}"
+        session_ids = list(self._redis.smembers(user_key))
+        if not session_ids:
+            return []
+        
+        raw_sessions = self._redis.mget(
+            [f"{self.SESSION_PREFIX}{session_id}" for session_id in session_ids]
+        )
+        
         sessions = []
-        now = datetime.utcnow()
-        for key, entry in self._cache.items():
-            if entry["data"].get("user_id") == user_id and now <= entry["expires_at"]:
-                session_data = entry["data"].copy()
-                session_data["session_id"] = key
-                sessions.append(session_data)
+        expired = []
+        for session_id, raw in zip(session_ids, raw_sessions):
+            if raw is None:
+                expired.append(session_id)
+                continue
+            session_data = json.loads(raw)
+            session_data["session_id"] = session_id
+            sessions.append(session_data)
+        
+        # Drop index entries whose session keys have already expired
+        if expired:
+            self._redis.srem(user_key, *expired)
+        
         return sessions
 
 
+def _create_session_cache() -> Any:
+    """Create the session cache configured by ``settings.session_backend``."""
+    default_ttl = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    if settings.session_backend == "redis":
+        return RedisSessionCache(settings.redis_url, default_ttl=default_ttl)
+    return SessionCache(default_ttl=default_ttl)
+
+
 # Global session cache
-_session_cache = SessionCache(default_ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_session_cache = _create_session_cache()
+
+# Seconds a user's token profile fields are cached for refreshes
+USER_CACHE_TTL = 300
+
+
+class RedisUserCache:
+    """Redis-backed cache of users' token profile fields, stored as JSON under ``user:{id}``."""
+    
+    USER_PREFIX = "user:"
+    
+    def __init__(self, redis_url: str, default_ttl: int = USER_CACHE_TTL):
+        import redis
+        
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._default_ttl = default_ttl
+    
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """Cache a user's profile fields."""
+        self._redis.setex(f"{self.USER_PREFIX}{key}", ttl or self._default_ttl, json.dumps(value))
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a user's cached profile fields."""
+        raw = self._redis.get(f"{self.USER_PREFIX}{key}")
+        if raw is None:
+            return None
+        return json.loads(raw)
+    
+    def delete(self, key: str) -> bool:
+        """Drop a user's cached profile fields."""
+        return bool(self._redis.delete(f"{self.USER_PREFIX}{key}"))
+
+
+def _create_user_cache() -> Any:
+    """Create the user profile cache on the configured session backend.
+    
+    Entries are dropped whenever a ``User`` row is updated or deleted
+    through the ORM; the TTL bounds staleness for any other writes. Only
+    display fields are cached; the active flag and role are never served
+    from here.
+    """
+    from sqlalchemy import event
+    from app.database import User
+    
+    if settings.session_backend == "redis":
+        cache = RedisUserCache(settings.redis_url)
+    else:
+        cache = SessionCache(default_ttl=USER_CACHE_TTL)
+    
+    def _invalidate(mapper, connection, target):
+        cache.delete(str(target.id))
+    
+    event.listen(User, "after_update", _invalidate)
+    event.listen(User, "after_delete", _invalidate)
+    return cache
+
+
+# Global cache of users' token profile fields (email, name)
+_user_cache = _create_user_cache()
+
+
+@dataclass(slots=True)
+class AuthenticatedUser:
+    """Lightweight view of a user for minting tokens (login and refresh)."""
+    id: int
+    email: str
+    name: str
+    user_type: Any
+    locked_until: Optional[datetime] = None
+
+
+@lru_cache(maxsize=1)
+def _login_query():
+    """Login lookup by email, built once and reused with a bound ``email``."""
+    from app.database import User
+    
+    return select(
+        User.id,
+        User.email,
+        User.name,
+        User.user_type,
+        User.password_hash,
+        User.is_active,
+        User.locked_until,
+    ).where(User.email == bindparam("email"))
 
 
 class AuthService:
@@ -164,11 +415,14 @@ class AuthService:
         self.rbac = get_rbac_service()
         self.session_cache = _session_cache
     
-    def authenticate_user(self, email: str, password: str) -> Optional[Any]:
-        """Authenticate user by email and password."""
-        from app.database import User
+    def authenticate_user(self, email: str, password: str) -> Optional["AuthenticatedUser"]:
+        """Authenticate user by email and password.
         
-        user = self.db.query(User).filter(User.email == email).first()
+        Only the columns needed for login are selected, so no ORM instance is
+        hydrated. Callers that need to persist changes should issue an UPDATE
+        by ``user.id``.
+        """
+        user = self.db.execute(_login_query(), {"email": email}).first()
         if not user:
             logger.info(f"Authentication failed: user not found for email {email}")
             return None
@@ -185,7 +439,30 @@ class AuthService:
             logger.info(f"Authentication failed: user {user.id} is inactive")
             return None
         
-        return user
+        return AuthenticatedUser(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            user_type=user.user_type,
+            locked_until=user.locked_until
+        )
+    
+    def _build_token_data(self, user: Any, session_id: str) -> Dict[str, Any]:
+        """Build JWT claims from the user's role template plus per-user fields."""
+        user_type = user.user_type.value
+        template = ROLE_TOKEN_TEMPLATE.get(user_type)
+        if template is None:
+            template = {
+                "user_type": user_type,
+                "permissions": self.rbac.get_permission_list(user_type)
+            }
+        
+        return {
+            **template,
+            "sub": str(user.id),
+            "email": user.email,
+            "session_id": session_id
+        }
     
     def create_tokens(
         self, 
@@ -195,15 +472,8 @@ class AuthService:
     ) -> Tuple[str, str, str]:
         """Create access and refresh tokens for a user."""
         session_id = generate_session_id()
-        permissions = self.rbac.get_permission_list(user.user_type.value)
-        
-        token_data = {
-            "sub": str(user.id),
-            "email": user.email,
-            "user_type": user.user_type.value,
-            "session_id": session_id,
-            "permissions": permissions
-        }
+        token_data = self._build_token_data(user, session_id)
+        permissions = token_data["permissions"]
         
         access_token = create_access_token(token_data)
         refresh_token = create_refresh_token(token_data)
@@ -219,7 +489,7 @@ class AuthService:
             "last_activity": datetime.utcnow(),
             "ip_address": ip_address,
             "user_agent": user_agent,
-            "refresh_token_hash": hashlib.sha256(refresh_token.encode()).hexdigest()
+            "refresh_token_hash": _hash_token(refresh_token)
         }
         self.session_cache.set(
             session_id, 
@@ -248,39 +518,62 @@ class AuthService:
             logger.warning(f"Session {session_id} not found in cache")
             return None
         
-        # Verify refresh token hash matches
-        token_hash = hashlib.sha256(refresh_token.encode()).hexdigest()
-        if session_data.get("refresh_token_hash") != token_hash:
+        # Verify refresh token hash matches (constant-time comparison)
+        stored_hash = session_data.get("refresh_token_hash") or ""
+        if not hmac.compare_digest(stored_hash, _hash_token(refresh_token)):
             logger.warning("Refresh token hash mismatch")
             return None
         
-        # Get user
-        from app.database import User
-        user_id = int(payload.get("sub"))
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user or not user.is_active:
+        user = self._get_token_user(int(payload.get("sub")))
+        if not user:
             return None
         
         # Create new tokens
-        permissions = self.rbac.get_permission_list(user.user_type.value)
-        token_data = {
-            "sub": str(user.id),
-            "email": user.email,
-            "user_type": user.user_type.value,
-            "session_id": session_id,
-            "permissions": permissions
-        }
+        token_data = self._build_token_data(user, session_id)
         
         new_access_token = create_access_token(token_data)
         new_refresh_token = create_refresh_token(token_data)
         
         # Update session
         session_data["last_activity"] = datetime.utcnow()
-        session_data["refresh_token_hash"] = hashlib.sha256(new_refresh_token.encode()).hexdigest()
+        session_data["refresh_token_hash"] = _hash_token(new_refresh_token)
         self.session_cache.set(session_id, session_data, ttl=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600)
         
         return new_access_token, new_refresh_token
     
+    def _get_token_user(self, user_id: int) -> Optional["AuthenticatedUser"]:
+        """Load the claims needed to mint tokens for an active user.
+        
+        The active flag and role are always read from the database (one
+        primary-key lookup), so deactivations and role changes apply on the
+        next refresh however they were written. Only the profile fields
+        (email, name) come from the user cache.
+        """
+        from app.database import User
+        
+        status = self.db.execute(
+            select(User.user_type, User.is_active).where(User.id == user_id)
+        ).first()
+        if not status or not status.is_active:
+            return None
+        
+        profile = _user_cache.get(str(user_id))
+        if profile is None:
+            row = self.db.execute(
+                select(User.email, User.name).where(User.id == user_id)
+            ).first()
+            if not row:
+                return None
+            profile = {"email": row.email, "name": row.name}
+            _user_cache.set(str(user_id), profile)
+        
+        return AuthenticatedUser(
+            id=user_id,
+            email=profile["email"],
+            name=profile["name"],
+            user_type=status.user_type
+        )
+    
     def logout(self, session_id: str) -> bool:
         """Logout a single session."""
         return self.session_cache.delete(session_id)
@@ -313,8 +606,10 @@ class AuthService:
         from app.database import User
         from app.database.models import UserRole
         
-        # Check if email exists
-        existing = self.db.query(User).filter(User.email == email).first()
+        # Check if email exists (id only; no need to hydrate the row)
+        existing = self.db.execute(
+            select(User.id).where(User.email == email).limit(1)
+        ).first()
         if existing:
             return None
         
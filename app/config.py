@@ -1,6 +1,7 @@
 """Application configuration settings."""
 import os
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -19,6 +20,12 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./data/onboarding.db"
+    strict_loading: bool = False  # Raise on undeclared lazy loads in list queries (enable in CI)
+    query_cache_size: int = 1200  # Compiled SQL statements kept per engine
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 2  # seconds to wait for a connection before failing
+    db_pool_recycle: int = 1800  # seconds before a pooled connection is replaced
     
     # ChromaDB
     chroma_persist_directory: str = "./data/chroma_db"
@@ -41,6 +48,8 @@ class Settings(BaseSettings):
     # Session Settings
     session_timeout_minutes: int = 60
     max_sessions_per_user: int = 5
+    session_backend: str = "memory"  # "memory" (single process) or "redis"
+    redis_url: str = "redis://localhost:6379/0"
     
     # Security Settings
     cors_origins: list = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -58,6 +67,7 @@ class Settings(BaseSettings):
     
     # Audit Settings
     audit_log_retention_days: int = 90
+    system_metrics_retention_days: int = 30
     
     # Paths
     base_dir: Path = Path(__file__).resolve().parent.parent
@@ -77,10 +87,18 @@ def get_settings() -> Settings:
     return Settings()
 
 
-# Create directories if they don't exist
-settings = get_settings()
-settings.data_dir.mkdir(parents=True, exist_ok=True)
-settings.policies_dir.mkdir(parents=True, exist_ok=True)
-settings.models_dir.mkdir(parents=True, exist_ok=True)
-Path(settings.chroma_persist_directory).mkdir(parents=True, exist_ok=True)
+def ensure_directories(settings: Optional[Settings] = None) -> None:
+    """Create the data, policy, model and ChromaDB directories if missing.
+    
+    Called explicitly by entrypoints (app startup, scripts) rather than at
+    import time, so importing the config has no filesystem side effects.
+    """
+    settings = settings or get_settings()
+    for directory in (
+        settings.data_dir,
+        settings.policies_dir,
+        settings.models_dir,
+        Path(settings.chroma_persist_directory),
+    ):
+        directory.mkdir(parents=True, exist_ok=True)
 
@@ -1,11 +1,15 @@
 # Database module
 from app.database.connection import get_db, engine, SessionLocal
+from app.database.bulk_writer import get_bulk_writer
+from app.database.loading import strict_load
 from app.database.models import Base, User, Task, Message, RoutingLog, AgentCallLog
 
 __all__ = [
     "get_db",
     "engine", 
     "SessionLocal",
+    "get_bulk_writer",
+    "strict_load",
     "Base",
     "User",
     "Task",
@@ -0,0 +1,225 @@
+"""Buffered bulk INSERTs for append-only log tables.
+
+Write-only rows (audit, routing, agent-call and metric logs) are queued as
+plain dicts and written in one executemany Core INSERT per table, which the
+engine sends as multi-row ``INSERT ... VALUES`` pages
+(``insertmanyvalues``). A buffer is flushed when it reaches ``batch_size``
+rows or by the background flusher every ``flush_interval`` seconds.
+
+On PostgreSQL, batches of at least ``copy_threshold`` rows are streamed with
+``COPY ... FROM STDIN`` instead, which skips per-row statement parsing.
+
+Producers run both on the event loop and in worker threads, so the buffer is
+guarded by a ``threading.Lock`` rather than an ``asyncio.Queue``.
+"""
+import io
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table, insert
+from sqlalchemy.engine import Connection, Engine
+
+from app.monitoring.metrics import BULK_ROWS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+# Rows per flush; also the engine's insertmanyvalues page size
+BATCH_SIZE = 1000
+
+# Seconds between background flushes
+FLUSH_INTERVAL = 0.25
+
+# Rows per batch from which PostgreSQL writes use COPY; buffers are flushed
+# at BATCH_SIZE, so full batches are copied and timed flushes are inserted
+COPY_THRESHOLD = BATCH_SIZE
+
+
+def _copy_text(value: Any) -> str:
+    """Encode one value for ``COPY`` text format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class BulkWriter:
+    """Collects rows per table and inserts them in batches."""
+
+    def __init__(
+        self,
+        bind: Engine,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        copy_threshold: int = COPY_THRESHOLD
+    ):
+        """Initialize the writer.
+
+        Args:
+            bind: Engine the batches are written through.
+            batch_size: Buffered rows per table that trigger a flush.
+            flush_interval: Seconds between background flushes.
+            copy_threshold: Batch size from which PostgreSQL uses COPY.
+        """
+        self.bind = bind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.copy_threshold = copy_threshold
+        self._lock = threading.Lock()
+        self._buffers: Dict[Table, List[Dict[str, Any]]] = defaultdict(list)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def add(self, table: Table, row: Dict[str, Any]) -> None:
+        """Queue a row for ``table``.
+
+        Without a running flusher (scripts, tests) the row is written
+        immediately so nothing is left behind in the buffer.
+        """
+        if not self.running:
+            self._write(table, [row])
+            return
+
+        with self._lock:
+            buffer = self._buffers[table]
+            buffer.append(row)
+            if len(buffer) < self.batch_size:
+                return
+            rows = self._buffers.pop(table)
+        self._write(table, rows)
+
+    def flush(self) -> None:
+        """Write every buffered row."""
+        with self._lock:
+            pending = list(self._buffers.items())
+            self._buffers.clear()
+        for table, rows in pending:
+            self._write(table, rows)
+
+    def _write(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        """Insert ``rows`` into ``table``, one executemany per key set.
+
+        If the batch fails, its rows are retried one per transaction so a
+        bad row (or a transient error) costs only the rows that still fail.
+        """
+        batches: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            batches[tuple(sorted(row))].append(row)
+
+        try:
+            with self.bind.begin() as conn:
+                for batch in batches.values():
+                    if len(batch) < self.copy_threshold or not self._copy(conn, table, batch):
+                        conn.execute(insert(table), batch)
+        except Exception:
+            logger.exception(
+                "Bulk insert of %s rows into %s failed; retrying row by row",
+                len(rows), table.name
+            )
+            self._write_each(table, rows)
+
+    def _write_each(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        """Insert ``rows`` one transaction each, counting the rows that fail."""
+        dropped = 0
+        for row in rows:
+            try:
+                with self.bind.begin() as conn:
+                    conn.execute(insert(table), row)
+            except Exception:
+                dropped += 1
+        if dropped:
+            BULK_ROWS_DROPPED.labels(table=table.name).inc(dropped)
+            logger.error("Dropped %s of %s rows for %s", dropped, len(rows), table.name)
+
+    def _copy(self, conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> bool:
+        """Stream ``rows`` (all with the same keys) into ``table`` with COPY.
+
+        Returns False when the connection cannot COPY (not PostgreSQL, or a
+        driver other than psycopg2/psycopg), leaving the rows to an INSERT.
+        """
+        dialect = conn.dialect
+        if dialect.name != "postgresql":
+            return False
+        cursor = conn.connection.dbapi_connection.cursor()
+        if not hasattr(cursor, "copy_expert") and not hasattr(cursor, "copy"):
+            cursor.close()
+            return False
+
+        # Values go through the column types as they would for an INSERT
+        # (enum codes, JSON serialization, address normalization),
+        # and missing keys fall back to scalar column defaults
+        columns = [
+            column for column in table.columns
+            if column.name in rows[0] or (column.default is not None and column.default.is_scalar)
+        ]
+        processors = [
+            column.type.dialect_impl(dialect).bind_processor(dialect) for column in columns
+        ]
+        buffer = io.StringIO()
+        for row in rows:
+            values = []
+            for column, process in zip(columns, processors):
+                value = row[column.name] if column.name in row else column.default.arg
+                if process is not None:
+                    value = process(value)
+                values.append(_copy_text(value))
+            buffer.write("\t".join(values))
+            buffer.write("\n")
+
+        names = ", ".join(dialect.identifier_preparer.quote(column.name) for column in columns)
+        sql = f"COPY {dialect.identifier_preparer.format_table(table)} ({names}) FROM STDIN"
+        try:
+            if hasattr(cursor, "copy_expert"):  # psycopg2
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bulk-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher, writing any remaining rows."""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+
+# Global bulk writer
+_bulk_writer: Optional[BulkWriter] = None
+
+
+def get_bulk_writer() -> BulkWriter:
+    """Get the global bulk writer instance."""
+    global _bulk_writer
+    if _bulk_writer is None:
+        from app.database.connection import engine
+        _bulk_writer = BulkWriter(engine)
+    return _bulk_writer
@@ -1,18 +1,50 @@
 """Database connection and session management."""
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from typing import Generator
 
 from app.config import get_settings
+from app.database.bulk_writer import BATCH_SIZE
 
 settings = get_settings()
 
+
+def json_serializer(value) -> str:
+    """Serialize JSON/JSONB column values with orjson."""
+    return orjson.dumps(
+        value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+
+# Connection pool sizing applies to server databases; SQLite uses the
+# dialect's default pool
+if "sqlite" in settings.database_url:
+    pool_options = {}
+else:
+    pool_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
 # Create engine
 engine = create_engine(
     settings.database_url,
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-    echo=settings.debug
+    # Test connections on checkout so a database restart doesn't surface as errors
+    pool_pre_ping=True,
+    **pool_options,
+    echo=settings.debug,
+    # Sized above the number of distinct statements the app issues so hot
+    # queries are never evicted and recompiled
+    query_cache_size=settings.query_cache_size,
+    # Batched log writes go out as multi-row INSERT pages of this size
+    insertmanyvalues_page_size=BATCH_SIZE,
+    json_serializer=json_serializer,
+    json_deserializer=orjson.loads
 )
 
 # Session factory
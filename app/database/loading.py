@@ -0,0 +1,22 @@
+"""Relationship loading guards for list queries."""
+from sqlalchemy.orm import raiseload
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def strict_load(stmt, *options):
+    """Apply loader options, forbidding any other relationship lazy load.
+
+    Works with both ``Select`` statements and legacy ``Query`` objects. When
+    ``settings.strict_loading`` is enabled (CI), any relationship that is
+    not eager-loaded through ``options`` raises instead of emitting a
+    per-row SELECT, so N+1 regressions in list endpoints fail loudly.
+    In production the options are applied as-is.
+    """
+    if settings.strict_loading:
+        return stmt.options(*options, raiseload("*", sql_only=True))
+    if options:
+        return stmt.options(*options)
+    return stmt
@@ -1,13 +1,73 @@
 """SQLAlchemy database models."""
-from datetime import datetime, date
+from datetime import date
 from enum import Enum as PyEnum
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Date, 
-    ForeignKey, Enum, Float, Boolean, JSON, Index
+    Column, Integer, BigInteger, String, Text, DateTime, Date, 
+    ForeignKey, Float, Boolean, JSON, LargeBinary, Index, Identity, Computed, text,
+    FetchedValue, event, func, inspect, select, update
 )
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, deferred, DeclarativeBase
 
-Base = declarative_base()
+from app.database.partitioning import daily_range_partitioned, hash_partitioned, monthly_range_partitioned
+from app.database.timestamps import utcnow
+from app.database.types import IPAddress, SmallIntEnum, UUIDString
+
+try:
+    from pgvector.sqlalchemy import HALFVEC
+except ImportError:  # pgvector is only needed for PostgreSQL deployments
+    HALFVEC = None
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all models."""
+
+
+# Dimension of the sentence-transformer embeddings (all-mpnet-base-v2)
+EMBEDDING_DIM = 768
+
+# Native vector search is used when pgvector is installed and the database
+# is PostgreSQL; other setups store embeddings as JSON arrays.
+HAS_PGVECTOR = HALFVEC is not None
+
+
+def _embedding_column_type():
+    """JSON embeddings, stored as FP16 pgvector ``halfvec`` on PostgreSQL.
+    
+    Embeddings are L2-normalized before they are stored, so cosine similarity
+    is a plain inner product.
+    """
+    if not HAS_PGVECTOR:
+        return JSON
+    return JSON().with_variant(HALFVEC(EMBEDDING_DIM), "postgresql")
+
+
+def _log_id_column_type():
+    """64-bit ids for high-volume log tables.
+
+    SQLite only auto-assigns rowids to ``INTEGER PRIMARY KEY`` columns, so the
+    column stays ``INTEGER`` there (which is already 64-bit in SQLite).
+    """
+    return BigInteger().with_variant(Integer, "sqlite")
+
+
+def _jsonb_column_type():
+    """JSON documents, stored as binary ``jsonb`` on PostgreSQL."""
+    return JSON().with_variant(JSONB(), "postgresql")
+
+
+def _timestamp_brin_index(table: str, column: str = "timestamp") -> Index:
+    """Time-range index for an append-only table.
+
+    Rows arrive in ``column`` order, so on PostgreSQL a BRIN index (a few
+    pages per table instead of an entry per row) serves range scans; other
+    dialects get a plain index.
+    """
+    return Index(
+        f"ix_{table}_{column}_brin", column,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 32},
+    )
 
 
 class TaskStatus(str, PyEnum):
@@ -64,6 +124,12 @@ class WorkflowTrigger(str, PyEnum):
     TASK_OVERDUE = "task_overdue"
 
 
+class Language(str, PyEnum):
+    """Supported languages."""
+    ENGLISH = "en"
+    ARABIC = "ar"
+
+
 class ChurnRisk(str, PyEnum):
     """Churn risk levels."""
     LOW = "low"
@@ -82,15 +148,32 @@ class User(Base):
     password_hash = Column(String(255), nullable=True)
     role = Column(String(100), nullable=False)  # Job role
     department = Column(String(100), nullable=False)
-    user_type = Column(Enum(UserRole), default=UserRole.NEW_HIRE)
+    user_type = Column(SmallIntEnum(UserRole), default=UserRole.NEW_HIRE)
     is_active = Column(Boolean, default=True, nullable=False)
     start_date = Column(Date, default=date.today)
     last_login = Column(DateTime, nullable=True)
     failed_login_attempts = Column(Integer, default=0)
     locked_until = Column(DateTime, nullable=True)
-    preferred_language = Column(String(10), default="en")  # For i18n: "en", "ar"
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    preferred_language = Column(SmallIntEnum(Language), default=Language.ENGLISH)  # For i18n
+    # Sum of points and number of unlocked achievements, maintained by
+    # UserAchievement events
+    total_points = Column(Integer, default=0, server_default="0", nullable=False)
+    achievement_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # Activity counters for achievement criteria, bumped at write time
+    questions_asked_count = Column(Integer, default=0, server_default="0", nullable=False)
+    feedback_given_count = Column(Integer, default=0, server_default="0", nullable=False)
+    login_streak_days = Column(Integer, default=0, server_default="0", nullable=False)
+    last_login_date = Column(Date, nullable=True)  # UTC date of the latest login
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())
+    
+    __table_args__ = (
+        # Top-N leaderboard reads
+        Index('ix_users_points_desc', text('total_points DESC')),
+    )
+    # Default eager_defaults="auto": server defaults (total_points, ...) come
+    # back via RETURNING on INSERT, and updated_at is expired on UPDATE so it
+    # is reloaded after the SQLite AFTER UPDATE trigger has stamped it
     
     # Relationships
     tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan")
@@ -109,19 +192,29 @@ class Task(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    department = Column(Enum(Department), nullable=False)
+    department = Column(SmallIntEnum(Department), nullable=False)
     title = Column(String(255), nullable=False)
     title_ar = Column(String(255), nullable=True)  # Arabic translation
     description = Column(Text)
     description_ar = Column(Text, nullable=True)  # Arabic translation
     due_date = Column(Date, nullable=False)
-    status = Column(Enum(TaskStatus), default=TaskStatus.NOT_STARTED)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    status = Column(SmallIntEnum(TaskStatus), default=TaskStatus.NOT_STARTED)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())
     completed_at = Column(DateTime, nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="tasks")
+    user = relationship("User", back_populates="tasks", lazy="raise_on_sql")
+    
+    __table_args__ = (
+        # "My tasks" / per-user overdue checks; covering on PostgreSQL
+        Index(
+            'ix_tasks_user_status_due', 'user_id', 'status', 'due_date',
+            postgresql_include=['title', 'department'],
+        ),
+        # Org-wide overdue scans
+        Index('ix_tasks_due_status', 'due_date', 'status'),
+    )
     
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, status={self.status})>"
@@ -131,35 +224,71 @@ class Message(Base):
     """Chat message model."""
     __tablename__ = "messages"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(_log_id_column_type(), Identity(always=True), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    text = Column(Text, nullable=False)
-    text_redacted = Column(Text)
+    # Deferred: loading a message (feedback, metadata scans) doesn't fetch
+    # the possibly TOASTed body unless it is accessed or selected explicitly
+    text = deferred(Column(Text, nullable=False))
+    # Length of text, materialized by the database on write
+    message_length = Column(Integer, Computed("length(text)", persisted=True))
     source = Column(String(50), nullable=False)
-    language = Column(String(10), default="en")  # Message language
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    extra_data = Column(JSON, nullable=True)
+    language = Column(SmallIntEnum(Language), default=Language.ENGLISH)  # Message language
+    timestamp = Column(DateTime, server_default=utcnow())
+    extra_data = Column(_jsonb_column_type(), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="messages")
+    user = relationship("User", back_populates="messages", lazy="raise_on_sql")
     feedback = relationship("Feedback", back_populates="message", uselist=False)
+    redaction = relationship(
+        "MessageRedaction", uselist=False, lazy="raise",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+    
+    __table_args__ = (
+        # Conversation history for a user, newest first. On PostgreSQL the
+        # INCLUDE columns let history listings (source, length) skip the heap.
+        Index(
+            'ix_messages_user_timestamp', 'user_id', 'timestamp',
+            postgresql_include=['source', 'message_length'],
+        ),
+        _timestamp_brin_index('messages'),
+    )
     
     def __repr__(self):
         return f"<Message(id={self.id}, source={self.source})>"
 
 
+class MessageRedaction(Base):
+    """PII-redacted copy of a user message.
+    
+    Kept in a 1:1 sibling table so metadata scans of ``messages``
+    (user, source, timestamp) don't read a second text column per row.
+    """
+    __tablename__ = "message_redactions"
+    
+    message_id = Column(
+        _log_id_column_type(),
+        ForeignKey("messages.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    text_redacted = Column(Text, nullable=False)
+    
+    def __repr__(self):
+        return f"<MessageRedaction(message_id={self.message_id})>"
+
+
 class Feedback(Base):
     """User feedback on assistant responses."""
     __tablename__ = "feedback"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=False, unique=True)
-    feedback_type = Column(Enum(FeedbackType), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    message_id = Column(_log_id_column_type(), ForeignKey("messages.id"), nullable=False, unique=True)
+    feedback_type = Column(SmallIntEnum(FeedbackType), nullable=False)
     comment = Column(Text, nullable=True)
     routing_was_correct = Column(Boolean, nullable=True)
     answer_was_accurate = Column(Boolean, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # For routing model retraining
     query_text = Column(Text, nullable=True)
@@ -167,37 +296,77 @@ class Feedback(Base):
     suggested_department = Column(String(50), nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="feedback")
-    message = relationship("Message", back_populates="feedback")
+    user = relationship("User", back_populates="feedback", lazy="raise_on_sql")
+    message = relationship("Message", back_populates="feedback", lazy="selectin")
     
     __table_args__ = (
         Index('ix_feedback_type_date', 'feedback_type', 'created_at'),
+        Index('ix_feedback_user_created', 'user_id', 'created_at'),
     )
     
     def __repr__(self):
         return f"<Feedback(id={self.id}, type={self.feedback_type})>"
 
 
+def _add_feedback_given(connection, feedback, delta: int):
+    """Apply ``delta`` to the author's ``users.feedback_given_count``."""
+    users = User.__table__
+    connection.execute(
+        update(users)
+        .where(users.c.id == feedback.user_id)
+        .values(feedback_given_count=users.c.feedback_given_count + delta)
+    )
+
+
+@event.listens_for(Feedback, "after_insert")
+def _feedback_inserted(mapper, connection, target):
+    _add_feedback_given(connection, target, 1)
+
+
+@event.listens_for(Feedback, "after_delete")
+def _feedback_deleted(mapper, connection, target):
+    _add_feedback_given(connection, target, -1)
+
+
 class SemanticCache(Base):
     """Cache for semantically similar queries."""
     __tablename__ = "semantic_cache"
     
     id = Column(Integer, primary_key=True, index=True)
-    query_hash = Column(String(64), unique=True, nullable=False, index=True)  # SHA-256 of normalized query
+    query_hash = Column(LargeBinary(32), unique=True, nullable=False, index=True)  # Raw SHA-256 of normalized query
     query_text = Column(Text, nullable=False)
-    query_embedding = Column(JSON, nullable=True)  # Store embedding vector
+    query_embedding = Column(_embedding_column_type(), nullable=True)  # Store embedding vector
     response = Column(Text, nullable=False)
-    sources = Column(JSON, nullable=True)
+    sources = Column(_jsonb_column_type(), nullable=True)
     department = Column(String(50), nullable=True)
     hit_count = Column(Integer, default=0)
     confidence_score = Column(Float, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_accessed = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    last_accessed = Column(DateTime, server_default=utcnow())
     expires_at = Column(DateTime, nullable=False)
     is_valid = Column(Boolean, default=True)
     
     __table_args__ = (
-        Index('ix_semantic_cache_valid_expires', 'is_valid', 'expires_at'),
+        # Lookups only consider valid entries, so only those are indexed
+        Index(
+            'ix_semcache_valid', 'expires_at',
+            postgresql_where=text('is_valid'),
+            sqlite_where=text('is_valid = 1'),
+        ),
+        # Eviction sweeps: expires_at grows with insertion order, so a BRIN
+        # summary stays tiny no matter how large the cache gets
+        Index(
+            'ix_semcache_expires_brin', 'expires_at',
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32},
+        ).ddl_if(dialect='postgresql'),
+        # ANN index for inner-product lookups on unit vectors (PostgreSQL + pgvector only)
+        Index(
+            'ix_semantic_cache_embedding_hnsw', 'query_embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'query_embedding': 'halfvec_ip_ops'},
+        ).ddl_if(dialect='postgresql', callable_=lambda *a, **kw: HAS_PGVECTOR),
     )
     
     def __repr__(self):
@@ -214,18 +383,23 @@ class FAQ(Base):
     answer = Column(Text, nullable=False)
     answer_ar = Column(Text, nullable=True)  # Arabic translation
     category = Column(String(50), nullable=False, index=True)
-    department = Column(Enum(Department), nullable=True)
-    tags = Column(JSON, nullable=True)  # List of tags for searchability
+    department = Column(SmallIntEnum(Department), nullable=True)
+    tags = Column(_jsonb_column_type(), nullable=True)  # List of tags for searchability
     is_published = Column(Boolean, default=True)
     view_count = Column(Integer, default=0)
     helpful_count = Column(Integer, default=0)
     not_helpful_count = Column(Integer, default=0)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())
     
     __table_args__ = (
         Index('ix_faqs_category_published', 'category', 'is_published'),
+        # Tag containment (tags @> '["security"]') on PostgreSQL
+        Index(
+            'ix_faq_tags_gin', 'tags',
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
     )
     
     def __repr__(self):
@@ -242,11 +416,11 @@ class Achievement(Base):
     description = Column(Text, nullable=False)
     description_ar = Column(Text, nullable=True)  # Arabic translation
     icon = Column(String(50), nullable=False)  # Icon name/emoji
-    category = Column(Enum(AchievementCategory), nullable=False)
+    category = Column(SmallIntEnum(AchievementCategory), nullable=False)
     points = Column(Integer, default=0)
     criteria = Column(JSON, nullable=False)  # Criteria to unlock
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     # Relationships
     user_achievements = relationship("UserAchievement", back_populates="achievement")
@@ -260,24 +434,75 @@ class UserAchievement(Base):
     __tablename__ = "user_achievements"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     achievement_id = Column(Integer, ForeignKey("achievements.id"), nullable=False)
-    unlocked_at = Column(DateTime, default=datetime.utcnow)
+    unlocked_at = Column(DateTime, server_default=utcnow())
     progress = Column(Float, default=0.0)  # 0-100 for partial progress
     is_notified = Column(Boolean, default=False)
     
     # Relationships
-    user = relationship("User", back_populates="achievements")
-    achievement = relationship("Achievement", back_populates="user_achievements")
+    user = relationship("User", back_populates="achievements", lazy="raise_on_sql")
+    achievement = relationship("Achievement", back_populates="user_achievements", lazy="joined")
     
     __table_args__ = (
-        Index('ix_user_achievements_user_achievement', 'user_id', 'achievement_id', unique=True),
+        # Progress rides along on PostgreSQL so unlocked checks skip the heap
+        Index(
+            'ix_user_achievements_user_achievement', 'user_id', 'achievement_id',
+            unique=True,
+            postgresql_include=['progress'],
+        ),
+        hash_partitioned('user_id'),
     )
     
     def __repr__(self):
         return f"<UserAchievement(user_id={self.user_id}, achievement_id={self.achievement_id})>"
 
 
+def _is_unlocked(progress) -> bool:
+    """Whether a ``user_achievements.progress`` value counts as unlocked."""
+    return progress is not None and progress >= 100
+
+
+def _add_user_points(connection, user_achievement, sign: int):
+    """Apply ``sign`` * the achievement's points to ``users.total_points``
+    and ``sign`` to ``users.achievement_count``."""
+    points = select(Achievement.points).where(
+        Achievement.id == user_achievement.achievement_id
+    ).scalar_subquery()
+    users = User.__table__
+    connection.execute(
+        update(users)
+        .where(users.c.id == user_achievement.user_id)
+        .values(
+            total_points=users.c.total_points + sign * func.coalesce(points, 0),
+            achievement_count=users.c.achievement_count + sign,
+        )
+    )
+
+
+@event.listens_for(UserAchievement, "after_insert")
+def _user_achievement_inserted(mapper, connection, target):
+    if _is_unlocked(target.progress):
+        _add_user_points(connection, target, 1)
+
+
+@event.listens_for(UserAchievement, "after_update")
+def _user_achievement_updated(mapper, connection, target):
+    history = inspect(target).attrs.progress.history
+    if not history.has_changes():
+        return
+    was_unlocked = _is_unlocked(history.deleted[0]) if history.deleted else False
+    now_unlocked = _is_unlocked(target.progress)
+    if now_unlocked != was_unlocked:
+        _add_user_points(connection, target, 1 if now_unlocked else -1)
+
+
+@event.listens_for(UserAchievement, "after_delete")
+def _user_achievement_deleted(mapper, connection, target):
+    if _is_unlocked(target.progress):
+        _add_user_points(connection, target, -1)
+
+
 class TrainingModule(Base):
     """Interactive training module definitions."""
     __tablename__ = "training_modules"
@@ -287,7 +512,7 @@ class TrainingModule(Base):
     title_ar = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
     description_ar = Column(Text, nullable=True)
-    department = Column(Enum(Department), nullable=False)
+    department = Column(SmallIntEnum(Department), nullable=False)
     content = Column(JSON, nullable=False)  # Module content (steps, questions, etc.)
     content_ar = Column(JSON, nullable=True)  # Arabic content
     duration_minutes = Column(Integer, default=30)
@@ -296,8 +521,8 @@ class TrainingModule(Base):
     order_index = Column(Integer, default=0)
     prerequisites = Column(JSON, nullable=True)  # List of module IDs
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())
     
     # Relationships
     progress = relationship("TrainingProgress", back_populates="module")
@@ -311,7 +536,7 @@ class TrainingProgress(Base):
     __tablename__ = "training_progress"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     module_id = Column(Integer, ForeignKey("training_modules.id"), nullable=False)
     status = Column(String(20), default="not_started")  # not_started, in_progress, completed, failed
     current_step = Column(Integer, default=0)
@@ -323,11 +548,14 @@ class TrainingProgress(Base):
     time_spent_seconds = Column(Integer, default=0)
     
     # Relationships
-    user = relationship("User", back_populates="training_progress")
-    module = relationship("TrainingModule", back_populates="progress")
+    user = relationship("User", back_populates="training_progress", lazy="raise_on_sql")
+    module = relationship("TrainingModule", back_populates="progress", lazy="selectin")
     
     __table_args__ = (
         Index('ix_training_progress_user_module', 'user_id', 'module_id', unique=True),
+        # Achievement stats: completed modules and perfect scores per user
+        Index('ix_training_progress_user_status_score', 'user_id', 'status', 'score'),
+        hash_partitioned('user_id'),
     )
     
     def __repr__(self):
@@ -341,13 +569,13 @@ class Workflow(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    trigger = Column(Enum(WorkflowTrigger), nullable=False)
-    conditions = Column(JSON, nullable=True)  # Conditions to execute
-    actions = Column(JSON, nullable=False)  # Actions to perform
+    trigger = Column(SmallIntEnum(WorkflowTrigger), nullable=False)
+    conditions = Column(_jsonb_column_type(), nullable=True)  # Conditions to execute
+    actions = Column(_jsonb_column_type(), nullable=False)  # Actions to perform
     is_active = Column(Boolean, default=True)
     priority = Column(Integer, default=0)  # Higher = runs first
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())
     
     # Relationships
     executions = relationship("WorkflowExecution", back_populates="workflow")
@@ -360,18 +588,28 @@ class WorkflowExecution(Base):
     """Log of workflow executions."""
     __tablename__ = "workflow_executions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    workflow_id = Column(Integer, ForeignKey("workflows.id"), nullable=False, index=True)
+    id = Column(_log_id_column_type(), Identity(always=True), primary_key=True)
+    workflow_id = Column(Integer, ForeignKey("workflows.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    trigger_data = Column(JSON, nullable=True)  # Data that triggered workflow
+    trigger_data = Column(_jsonb_column_type(), nullable=True)  # Data that triggered workflow
     status = Column(String(20), default="pending")  # pending, running, completed, failed
     result = Column(JSON, nullable=True)  # Execution result
     error_message = Column(Text, nullable=True)
-    started_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, server_default=utcnow())
     completed_at = Column(DateTime, nullable=True)
     
     # Relationships
-    workflow = relationship("Workflow", back_populates="executions")
+    workflow = relationship("Workflow", back_populates="executions", lazy="joined")
+    
+    __table_args__ = (
+        # Pending/running queue scans per workflow, already in start order
+        Index('ix_wfexec_wf_status_started', 'workflow_id', 'status', 'started_at'),
+        # Containment / key-path searches over trigger payloads (jsonb only)
+        Index(
+            'ix_workflow_trigger_data_gin', 'trigger_data',
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+    )
     
     def __repr__(self):
         return f"<WorkflowExecution(id={self.id}, workflow_id={self.workflow_id}, status={self.status})>"
@@ -382,7 +620,7 @@ class EngagementMetrics(Base):
     __tablename__ = "engagement_metrics"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     date = Column(Date, nullable=False)
     
     # Daily engagement metrics
@@ -396,11 +634,36 @@ class EngagementMetrics(Base):
     positive_feedback_given = Column(Integer, default=0)
     negative_feedback_given = Column(Integer, default=0)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Daily activity score for churn features, materialized by the database on write
+    engagement_score = Column(
+        Integer,
+        Computed(
+            "chat_messages_sent + tasks_completed * 5 + login_count * 2"
+            " + session_duration_seconds / 60",
+            persisted=True,
+        ),
+    )
+    
+    created_at = Column(DateTime, server_default=utcnow())
     
     __table_args__ = (
-        Index('ix_engagement_user_date', 'user_id', 'date', unique=True),
+        # Covers user_id lookups too. On PostgreSQL the INCLUDE columns make
+        # per-user date-range scans for churn features index-only; other
+        # dialects get a plain compound index.
+        Index(
+            'ix_engagement_user_date', 'user_id', 'date', unique=True,
+            postgresql_include=[
+                'chat_messages_sent', 'tasks_completed', 'tasks_started',
+                'login_count', 'session_duration_seconds', 'faq_views',
+                'training_time_seconds', 'positive_feedback_given',
+                'negative_feedback_given',
+            ],
+        ),
+        Index('ix_engagement_score_date', 'date', 'engagement_score'),
+        monthly_range_partitioned('date'),
     )
+    # Fetch the generated engagement_score via RETURNING, not a later SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     def __repr__(self):
         return f"<EngagementMetrics(user_id={self.user_id}, date={self.date})>"
@@ -411,11 +674,11 @@ class ChurnPrediction(Base):
     __tablename__ = "churn_predictions"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    prediction_date = Column(DateTime, default=datetime.utcnow)
-    risk_level = Column(Enum(ChurnRisk), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    prediction_date = Column(DateTime, server_default=utcnow())
+    risk_level = Column(SmallIntEnum(ChurnRisk), nullable=False)
     churn_probability = Column(Float, nullable=False)  # 0-1 probability
-    risk_factors = Column(JSON, nullable=True)  # Factors contributing to risk
+    risk_factors = Column(_jsonb_column_type(), nullable=True)  # Factors contributing to risk
     recommended_actions = Column(JSON, nullable=True)
     model_version = Column(String(50), nullable=True)
     is_acknowledged = Column(Boolean, default=False)
@@ -424,6 +687,7 @@ class ChurnPrediction(Base):
     
     __table_args__ = (
         Index('ix_churn_user_date', 'user_id', 'prediction_date'),
+        Index('ix_churn_user_level_date', 'user_id', 'risk_level', 'prediction_date'),
     )
     
     def __repr__(self):
@@ -435,7 +699,7 @@ class CalendarEvent(Base):
     __tablename__ = "calendar_events"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True)
     training_module_id = Column(Integer, ForeignKey("training_modules.id"), nullable=True)
     
@@ -454,8 +718,18 @@ class CalendarEvent(Base):
     reminder_minutes = Column(Integer, default=30)
     is_reminder_sent = Column(Boolean, default=False)
     
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), server_onupdate=FetchedValue())
+    
+    __table_args__ = (
+        # A user's events in a time range; also serves user_id lookups
+        Index('ix_calendar_events_user_start', 'user_id', 'start_time'),
+        # Reminder cron: only unsent reminders are indexed on PostgreSQL
+        Index(
+            'ix_calendar_reminder', 'is_reminder_sent', 'start_time',
+            postgresql_where=text("NOT is_reminder_sent"),
+        ),
+    )
     
     def __repr__(self):
         return f"<CalendarEvent(id={self.id}, title={self.title})>"
@@ -465,7 +739,7 @@ class RoutingLog(Base):
     """Log for routing model predictions."""
     __tablename__ = "routing_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(_log_id_column_type(), Identity(always=True), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     query_text = Column(Text, nullable=False)
     query_text_redacted = Column(Text)
@@ -473,7 +747,12 @@ class RoutingLog(Base):
     prediction_confidence = Column(Float)
     final_department = Column(String(50))
     was_overridden = Column(Boolean, default=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, server_default=utcnow(), nullable=False)
+    
+    __table_args__ = (
+        _timestamp_brin_index('routing_logs'),
+        monthly_range_partitioned('timestamp'),
+    )
     
     def __repr__(self):
         return f"<RoutingLog(id={self.id}, predicted={self.predicted_department})>"
@@ -483,19 +762,24 @@ class AgentCallLog(Base):
     """Log for agent invocations."""
     __tablename__ = "agent_call_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(_log_id_column_type(), Identity(always=True), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=True)
+    message_id = Column(_log_id_column_type(), ForeignKey("messages.id"), nullable=True)
     agent_name = Column(String(100), nullable=False)
     input_summary = Column(Text)
     output_summary = Column(Text)
     retrieval_k = Column(Integer)
-    retrieval_docs = Column(JSON)
+    retrieval_docs = Column(_jsonb_column_type())
     retrieval_time_ms = Column(Float)
     total_time_ms = Column(Float)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, server_default=utcnow(), nullable=False)
     error = Column(Text, nullable=True)
     
+    __table_args__ = (
+        _timestamp_brin_index('agent_call_logs'),
+        monthly_range_partitioned('timestamp'),
+    )
+    
     def __repr__(self):
         return f"<AgentCallLog(id={self.id}, agent={self.agent_name})>"
 
@@ -504,11 +788,16 @@ class SystemMetrics(Base):
     """System metrics for monitoring."""
     __tablename__ = "system_metrics"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(_log_id_column_type(), Identity(always=True), primary_key=True)
     metric_name = Column(String(100), nullable=False, index=True)
     metric_value = Column(Float, nullable=False)
-    labels = Column(JSON)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    labels = Column(_jsonb_column_type())
+    timestamp = Column(DateTime, server_default=utcnow(), nullable=False)
+    
+    __table_args__ = (
+        _timestamp_brin_index('system_metrics'),
+        daily_range_partitioned('timestamp'),
+    )
     
     def __repr__(self):
         return f"<SystemMetrics(name={self.metric_name}, value={self.metric_value})>"
@@ -518,23 +807,38 @@ class AuditLog(Base):
     """Comprehensive audit log for all system actions."""
     __tablename__ = "audit_logs"
     
-    id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    id = Column(_log_id_column_type(), Identity(always=True), primary_key=True)
+    timestamp = Column(DateTime, server_default=utcnow(), nullable=False)
     action = Column(String(100), nullable=False, index=True)
-    resource_type = Column(String(50), nullable=False, index=True)
+    resource_type = Column(String(50), nullable=False)
     resource_id = Column(Integer, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     user_email = Column(String(255), nullable=True)
-    session_id = Column(String(100), nullable=True, index=True)
-    ip_address = Column(String(45), nullable=True)
+    session_id = Column(UUIDString(), nullable=True, index=True)
+    ip_address = Column(IPAddress(), nullable=True)
     user_agent = Column(String(500), nullable=True)
-    details = Column(JSON, nullable=True)
+    details = Column(_jsonb_column_type(), nullable=True)
     status = Column(String(20), default="success", nullable=False)
     error_message = Column(Text, nullable=True)
     
     __table_args__ = (
+        _timestamp_brin_index('audit_logs'),
         Index('ix_audit_logs_user_timestamp', 'user_id', 'timestamp'),
         Index('ix_audit_logs_action_timestamp', 'action', 'timestamp'),
+        # Failures are a small fraction of rows; index only those for triage
+        Index(
+            'ix_audit_failures', 'timestamp', 'action',
+            postgresql_where=text("status = 'failure'"),
+            sqlite_where=text("status = 'failure'"),
+        ),
+        # Resource history lookups (also serves resource_type-only filters)
+        Index('ix_audit_resource', 'resource_type', 'resource_id'),
+        # Containment / key-path searches over audit details (jsonb only)
+        Index(
+            'ix_audit_details_gin', 'details',
+            postgresql_using='gin',
+        ).ddl_if(dialect='postgresql'),
+        monthly_range_partitioned('timestamp'),
     )
     
     def __repr__(self):
@@ -546,17 +850,22 @@ class UserSession(Base):
     __tablename__ = "user_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String(100), unique=True, nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    refresh_token_hash = Column(String(64), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    session_id = Column(UUIDString(), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    refresh_token_hash = Column(LargeBinary(32), nullable=False)  # Raw BLAKE2b-256 HMAC
+    created_at = Column(DateTime, server_default=utcnow(), nullable=False)
     expires_at = Column(DateTime, nullable=False)
-    last_activity = Column(DateTime, default=datetime.utcnow, nullable=False)
-    ip_address = Column(String(45), nullable=True)
+    last_activity = Column(DateTime, server_default=utcnow(), nullable=False)
+    ip_address = Column(IPAddress(), nullable=True)
     user_agent = Column(String(500), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
     
-    user = relationship("User")
+    user = relationship("User", lazy="joined")
+    
+    __table_args__ = (
+        # Active-session listing and revocation per user
+        Index('ix_user_sessions_user_active', 'user_id', 'is_active'),
+    )
     
     def __repr__(self):
         return f"<UserSession(id={self.id}, user_id={self.user_id}, active={self.is_active})>"
@@ -0,0 +1,262 @@
+"""Table partitioning helpers (PostgreSQL only).
+
+Models opt in through their ``__table_args__``:
+
+- ``monthly_range_partitioned(column)`` for append-only tables. The table is
+  created ``PARTITION BY RANGE`` with a DEFAULT partition plus partitions
+  for the coming months; retention then detaches and drops whole months
+  instead of deleting rows.
+- ``daily_range_partitioned(column)`` is the same with one partition per day,
+  for high-volume tables such as ``system_metrics``.
+- ``hash_partitioned(column, modulus)`` for write-hot per-user tables. The
+  table is created ``PARTITION BY HASH`` with all ``modulus`` partitions.
+
+Other dialects create an ordinary table.
+"""
+import asyncio
+import logging
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import PrimaryKeyConstraint, Table, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+
+logger = logging.getLogger(__name__)
+
+# Table.info key holding the partition column of a partitioned table
+PARTITION_KEY = "partition_key"
+
+# Table.info key holding the partition count of a hash-partitioned table
+HASH_MODULUS = "hash_modulus"
+
+# Table.info key marking a range-partitioned table as split per day
+DAILY = "daily"
+
+# Seconds between the periodic maintain_partitions runs of a live process
+PARTITION_MAINTENANCE_INTERVAL = 3600
+
+# Range partitions are named <table>_pYYYYMM (monthly) or <table>_pYYYYMMDD (daily)
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})(\d{2})?$")
+
+
+def monthly_range_partitioned(column: str) -> Dict[str, Any]:
+    """Table keyword arguments for a table range-partitioned by ``column``."""
+    return {
+        "postgresql_partition_by": f"RANGE ({column})",
+        "info": {PARTITION_KEY: column},
+    }
+
+
+def daily_range_partitioned(column: str) -> Dict[str, Any]:
+    """Table keyword arguments for a table range-partitioned by ``column`` per day."""
+    return {
+        "postgresql_partition_by": f"RANGE ({column})",
+        "info": {PARTITION_KEY: column, DAILY: True},
+    }
+
+
+def hash_partitioned(column: str, modulus: int = 16) -> Dict[str, Any]:
+    """Table keyword arguments for a table hash-partitioned by ``column``."""
+    return {
+        "postgresql_partition_by": f"HASH ({column})",
+        "info": {PARTITION_KEY: column, HASH_MODULUS: modulus},
+    }
+
+
+@compiles(PrimaryKeyConstraint, "postgresql")
+def _primary_key_with_partition_key(constraint, compiler, **kw):
+    """Add the partition column to a partitioned table's primary key.
+
+    PostgreSQL requires every unique constraint on a partitioned table to
+    include the partition column; the ORM identity stays the ``id`` column.
+    """
+    ddl = compiler.visit_primary_key_constraint(constraint, **kw)
+    key = constraint.table.info.get(PARTITION_KEY)
+    if not ddl or not key or key in constraint.columns.keys():
+        return ddl
+    head, sep, tail = ddl.partition(")")
+    return f"{head}, {compiler.preparer.quote(key)}{sep}{tail}"
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def create_hash_partitions(connection: Connection, table: str, modulus: int) -> None:
+    """Create all ``modulus`` partitions of a hash-partitioned table."""
+    for remainder in range(modulus):
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table}_h{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+        ))
+
+
+def _create_range_partition(
+    connection: Connection,
+    table: Table,
+    name: str,
+    start: date,
+    end: date
+) -> None:
+    """Create partition ``name`` of ``table`` for the range ``[start, end)``.
+
+    Rows for the range may already sit in the DEFAULT partition (written
+    while no partition covered them), which makes a plain ``CREATE TABLE ...
+    PARTITION OF`` fail. The partition is therefore created standalone, those
+    rows are moved into it, and it is attached afterwards.
+    """
+    exists = connection.execute(
+        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+    ).scalar()
+    if exists:
+        return
+    quote = connection.dialect.identifier_preparer.quote
+    key = quote(table.info[PARTITION_KEY])
+    # Generated columns are recomputed on insert
+    columns = ", ".join(quote(column.name) for column in table.columns if column.computed is None)
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE {table.name} "
+        f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+    ))
+    moved = connection.execute(text(
+        f"WITH moved AS (DELETE FROM {table.name}_default "
+        f"WHERE {key} >= :start AND {key} < :end RETURNING {columns}) "
+        f"INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+    ), {"start": start, "end": end}).rowcount
+    connection.execute(text(
+        f"ALTER TABLE {table.name} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    if moved:
+        logger.info("Moved %s rows of %s from the default partition to %s", moved, table.name, name)
+
+
+def ensure_monthly_partitions(
+    connection: Connection,
+    table: Table,
+    months_ahead: int = 3,
+    today: Optional[date] = None
+) -> None:
+    """Create the current month's partition and the next ``months_ahead``."""
+    start = _month_start(today or date.today())
+    for _ in range(months_ahead + 1):
+        end = _next_month(start)
+        _create_range_partition(connection, table, f"{table.name}_p{start:%Y%m}", start, end)
+        start = end
+
+
+def ensure_daily_partitions(
+    connection: Connection,
+    table: Table,
+    days_ahead: int = 7,
+    today: Optional[date] = None
+) -> None:
+    """Create today's partition and the next ``days_ahead``."""
+    start = today or date.today()
+    for _ in range(days_ahead + 1):
+        end = start + timedelta(days=1)
+        _create_range_partition(connection, table, f"{table.name}_p{start:%Y%m%d}", start, end)
+        start = end
+
+
+def drop_partitions_before(connection: Connection, table: str, cutoff: date) -> List[str]:
+    """Detach and drop range partitions whose whole range is before ``cutoff``."""
+    children = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table}).scalars().all()
+
+    dropped = []
+    for child in children:
+        match = _PARTITION_SUFFIX.search(child)
+        if not match:
+            continue  # DEFAULT partition
+        year, month, day = match.groups()
+        if day:
+            partition_end = date(int(year), int(month), int(day)) + timedelta(days=1)
+        else:
+            partition_end = _next_month(date(int(year), int(month), 1))
+        if partition_end <= cutoff:
+            connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {child}"))
+            connection.execute(text(f"DROP TABLE {child}"))
+            dropped.append(child)
+
+    if dropped:
+        logger.info(f"Dropped {len(dropped)} expired partitions of {table}")
+    return dropped
+
+
+def _ensure_range_partitions(connection: Connection, table: Table, months_ahead: int = 3) -> None:
+    if table.info.get(DAILY):
+        ensure_daily_partitions(connection, table)
+    else:
+        ensure_monthly_partitions(connection, table, months_ahead)
+
+
+def maintain_partitions(bind, retention_days: Optional[Dict[str, int]] = None, months_ahead: int = 3) -> None:
+    """Pre-create upcoming partitions and drop expired ones.
+
+    Runs at application startup and then every
+    ``PARTITION_MAINTENANCE_INTERVAL`` seconds
+    (``maintain_partitions_periodically``). ``retention_days`` maps table
+    names to how long their rows are kept. Each table is maintained in its
+    own savepoint; a failure is logged and the other tables still proceed.
+    """
+    if bind.dialect.name != "postgresql":
+        return
+
+    from app.database.models import Base
+
+    retention_days = retention_days or {}
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if PARTITION_KEY not in table.info or HASH_MODULUS in table.info:
+                continue
+            try:
+                with connection.begin_nested():
+                    _ensure_range_partitions(connection, table, months_ahead)
+                    if table.name in retention_days:
+                        cutoff = date.today() - timedelta(days=retention_days[table.name])
+                        drop_partitions_before(connection, table.name, cutoff)
+            except Exception:
+                logger.exception("Partition maintenance of %s failed", table.name)
+
+
+async def maintain_partitions_periodically(
+    bind,
+    retention_days: Optional[Dict[str, int]] = None,
+    interval: float = PARTITION_MAINTENANCE_INTERVAL
+) -> None:
+    """Run ``maintain_partitions`` every ``interval`` seconds until cancelled.
+
+    Keeps upcoming partitions created and expired ones dropped while the
+    process stays up; startup runs the first pass itself.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(maintain_partitions, bind, retention_days)
+        except Exception:
+            logger.exception("Periodic partition maintenance failed")
+
+
+@event.listens_for(Table, "after_create")
+def _create_initial_partitions(table: Table, connection: Connection, **kw):
+    """Give a newly created partitioned table somewhere to put its rows."""
+    if PARTITION_KEY not in table.info or connection.dialect.name != "postgresql":
+        return
+    if HASH_MODULUS in table.info:
+        create_hash_partitions(connection, table.name, table.info[HASH_MODULUS])
+        return
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {table.name}_default PARTITION OF {table.name} DEFAULT"
+    ))
+    _ensure_range_partitions(connection, table)
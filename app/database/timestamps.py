@@ -0,0 +1,111 @@
+"""Database-maintained timestamps.
+
+``created_at``-style columns use ``server_default=utcnow()`` so the database
+stamps each row on INSERT, and ``updated_at`` columns are kept current by a
+trigger instead of an ORM ``onupdate`` hook. Models mark such a column with
+``server_onupdate=FetchedValue()`` so the ORM knows to reload it after an
+UPDATE.
+
+Timestamps are naive UTC, matching the values the application compares them
+with (``datetime.utcnow()``).
+"""
+from sqlalchemy import DateTime, Table, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+# Column kept current by the update trigger
+UPDATED_AT = "updated_at"
+
+
+class utcnow(FunctionElement):
+    """Current UTC time, evaluated by the database."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP only has whole seconds; keep milliseconds so rows
+    # written within the same second still sort in order
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+class minutes_before(FunctionElement):
+    """``timestamp`` minus ``minutes`` (an integer expression) minutes."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(minutes_before)
+def _minutes_before_default(element, compiler, **kw):
+    timestamp, minutes = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"({timestamp} - {minutes} * INTERVAL '1 minute')"
+
+
+@compiles(minutes_before, "sqlite")
+def _minutes_before_sqlite(element, compiler, **kw):
+    timestamp, minutes = (compiler.process(arg, **kw) for arg in element.clauses)
+    # Same text format the DateTime type stores, so comparisons stay textual
+    return f"STRFTIME('%Y-%m-%d %H:%M:%f', {timestamp}, -({minutes}) || ' minutes')"
+
+
+def _has_update_trigger(table: Table) -> bool:
+    column = table.c.get(UPDATED_AT)
+    return column is not None and column.server_onupdate is not None
+
+
+def create_updated_at_trigger(connection: Connection, table: str) -> None:
+    """Install the trigger that sets ``updated_at`` whenever a row changes."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$ "
+            "BEGIN NEW.updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP); RETURN NEW; END "
+            "$$ LANGUAGE plpgsql"
+        ))
+        connection.execute(text(
+            f"CREATE OR REPLACE TRIGGER trg_{table}_updated_at BEFORE UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION set_updated_at()"
+        ))
+    elif connection.dialect.name == "sqlite":
+        # SQLite triggers cannot modify NEW, so stamp the row after the update;
+        # the WHEN guard keeps the trigger from firing on its own UPDATE
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table}_updated_at AFTER UPDATE ON {table} "
+            f"FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN "
+            f"UPDATE {table} SET updated_at = STRFTIME('%Y-%m-%d %H:%M:%f', 'now') "
+            f"WHERE rowid = NEW.rowid; END"
+        ))
+
+
+def ensure_updated_at_triggers(bind) -> None:
+    """Install missing ``updated_at`` triggers on existing tables.
+
+    New tables get theirs when they are created; this covers databases
+    created before the triggers existed.
+    """
+    from app.database.models import Base
+
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if _has_update_trigger(table):
+                create_updated_at_trigger(connection, table.name)
+
+
+@event.listens_for(Table, "after_create")
+def _create_updated_at_trigger(table: Table, connection: Connection, **kw):
+    """Install the ``updated_at`` trigger on a newly created table."""
+    if _has_update_trigger(table):
+        create_updated_at_trigger(connection, table.name)
@@ -0,0 +1,98 @@
+"""Custom SQLAlchemy column types."""
+import ipaddress
+import uuid
+from enum import Enum as PyEnum
+from typing import Any, Optional, Type
+
+from sqlalchemy import SmallInteger, String, Uuid
+from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.types import TypeDecorator
+
+
+class SmallIntEnum(TypeDecorator):
+    """Store a Python enum as a SMALLINT code instead of its string label.
+    
+    Codes are the members' positions in declaration order, so new members
+    must only ever be appended to the enum. Bound values may be enum
+    members, their values, or their names.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class: Type[PyEnum], *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.enum_class = enum_class
+        self._members = tuple(enum_class)
+        self._codes = {member: code for code, member in enumerate(self._members)}
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        if not isinstance(value, self.enum_class):
+            try:
+                value = self.enum_class(value)
+            except ValueError:
+                value = self.enum_class[value]
+        return self._codes[value]
+    
+    def process_result_value(self, value: Optional[int], dialect) -> Any:
+        if value is None:
+            return None
+        return self._members[value]
+    
+    @property
+    def python_type(self) -> Type[PyEnum]:
+        return self.enum_class
+
+
+class IPAddress(TypeDecorator):
+    """Client IP address, stored as ``inet`` on PostgreSQL.
+    
+    Other dialects store the text form. Values that are not an IPv4/IPv6
+    address (e.g. ``"unknown"``) are stored as NULL rather than failing the
+    insert.
+    """
+    
+    impl = String(45)
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(INET())
+        return dialect.type_descriptor(self.impl)
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        try:
+            return str(ipaddress.ip_address(str(value).strip()))
+        except ValueError:
+            return None
+    
+    @property
+    def python_type(self) -> Type[str]:
+        return str
+
+
+class UUIDString(TypeDecorator):
+    """UUID passed around as a string, stored natively where supported.
+    
+    PostgreSQL stores a 16-byte ``uuid``; other dialects a 32-character hex
+    string. Values that are not UUIDs are stored as NULL.
+    """
+    
+    impl = Uuid(as_uuid=False)
+    cache_ok = True
+    
+    def process_bind_param(self, value: Any, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return None
+    
+    @property
+    def python_type(self) -> Type[str]:
+        return str
@@ -1,18 +1,24 @@
 """Main FastAPI application for the Enterprise Onboarding Copilot."""
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import orjson
 import structlog
 
-from app.config import get_settings
-from app.database import engine, Base
+from app.config import get_settings, ensure_directories
+from app.database import engine, Base, get_bulk_writer
+from app.database.partitioning import maintain_partitions, maintain_partitions_periodically
+from app.database.timestamps import ensure_updated_at_triggers
 from app.api.routes import router
 from app.api.auth_routes import router as auth_router
 from app.api.feature_routes import router as feature_router
 from app.api.middleware import SecurityMiddleware, MetricsMiddleware
 from app.audit.middleware import AuditMiddleware
+from app.monitoring.events import start_event_queue, stop_event_queue
+from app.monitoring.metrics import DB_POOL_IN_USE
 
 # Configure logging
 logging.basicConfig(
@@ -20,13 +26,19 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    """orjson-backed serializer for structlog's JSONRenderer (which expects str)."""
+    return orjson.dumps(obj, **kwargs).decode()
+
+
 structlog.configure(
     processors=[
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps)
     ],
     wrapper_class=structlog.stdlib.BoundLogger,
     context_class=dict,
@@ -43,10 +55,40 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up Enterprise Onboarding Copilot")
     
+    # Data directories must exist before SQLite/ChromaDB open their files
+    ensure_directories(settings)
+    
     # Create database tables
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created")
     
+    # Tables created before updated_at became trigger-maintained need theirs
+    ensure_updated_at_triggers(engine)
+    
+    # Pre-create upcoming partitions and drop expired audit/metrics ones
+    # (no-op outside PostgreSQL), now and periodically while running
+    retention_days = {
+        "audit_logs": settings.audit_log_retention_days,
+        "system_metrics": settings.system_metrics_retention_days,
+    }
+    try:
+        maintain_partitions(engine, retention_days=retention_days)
+    except Exception as e:
+        logger.warning(f"Could not maintain partitions: {e}")
+    partition_maintenance = asyncio.create_task(
+        maintain_partitions_periodically(engine, retention_days)
+    )
+    
+    # Report pool usage at scrape time (pools that track checkouts only)
+    if hasattr(engine.pool, "checkedout"):
+        DB_POOL_IN_USE.set_function(engine.pool.checkedout)
+    
+    # Batched writer for append-only log rows (audit, routing)
+    get_bulk_writer().start()
+    
+    # Background consumer for per-request metrics and audit records
+    start_event_queue()
+    
     # Initialize hybrid search index if needed
     try:
         from rag.hybrid_search import get_hybrid_search_engine
@@ -114,6 +156,13 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Enterprise Onboarding Copilot")
+    partition_maintenance.cancel()
+    try:
+        await partition_maintenance
+    except asyncio.CancelledError:
+        pass
+    await stop_event_queue()
+    get_bulk_writer().stop()
 
 
 # Create FastAPI app
@@ -2,12 +2,14 @@
 from app.monitoring.metrics import (
     get_metrics_collector,
     MetricsCollector,
+    record_request,
     REGISTRY
 )
 
 __all__ = [
     "get_metrics_collector",
     "MetricsCollector",
+    "record_request",
     "REGISTRY"
 ]
 
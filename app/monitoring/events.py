@@ -0,0 +1,96 @@
+"""Background queue for request bookkeeping (metrics and audit records).
+
+Middleware hands each record to ``submit_event`` and returns; a single
+consumer task drains the queue in batches and runs the recorders in a worker
+thread, so neither lock waits nor audit writes sit on the request path.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.monitoring.metrics import EVENTS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+# Pending records before new ones are dropped
+EVENT_QUEUE_SIZE = 10000
+
+# Records handed to the worker thread per batch
+EVENT_BATCH_SIZE = 256
+
+Event = Tuple[Callable[..., Any], Tuple[Any, ...], Dict[str, Any]]
+
+# Queued by stop_event_queue; the consumer exits once it reaches it
+_STOP = object()
+
+_queue: Optional[asyncio.Queue] = None
+_consumer: Optional[asyncio.Task] = None
+
+
+def submit_event(func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Queue ``func(*args, **kwargs)`` to run in the background.
+
+    Runs the call immediately when the queue is not started (scripts, tests).
+    """
+    if _queue is None:
+        _run_batch([(func, args, kwargs)])
+        return
+    try:
+        _queue.put_nowait((func, args, kwargs))
+    except asyncio.QueueFull:
+        EVENTS_DROPPED.inc()
+
+
+def _run_batch(batch: List[Event]) -> None:
+    for func, args, kwargs in batch:
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Background event {func.__name__} failed: {e}")
+
+
+async def _drain_events(queue: asyncio.Queue) -> None:
+    while True:
+        batch = []
+        event = await queue.get()
+        while event is not _STOP:
+            batch.append(event)
+            if len(batch) >= EVENT_BATCH_SIZE or queue.empty():
+                break
+            event = queue.get_nowait()
+        if batch:
+            await asyncio.to_thread(_run_batch, batch)
+        if event is _STOP:
+            return
+
+
+def start_event_queue() -> None:
+    """Create the queue and its consumer task on the running event loop."""
+    global _queue, _consumer
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+    _consumer = asyncio.create_task(_drain_events(_queue))
+
+
+async def stop_event_queue() -> None:
+    """Stop the consumer and run whatever is still queued.
+
+    The consumer is stopped with a marker rather than cancelled, so a batch
+    already running in the worker thread finishes before this returns (and
+    before the caller stops the bulk writer those records write through).
+    """
+    global _queue, _consumer
+    if _queue is None:
+        return
+    queue, consumer = _queue, _consumer
+    await queue.put(_STOP)
+    await consumer
+
+    # Records submitted after the marker
+    remaining = []
+    while not queue.empty():
+        remaining.append(queue.get_nowait())
+    _queue = None
+    _consumer = None
+    _run_batch(remaining)
@@ -1,12 +1,13 @@
 """Prometheus metrics for production monitoring."""
+import asyncio
 import time
 import logging
 from typing import Dict, Any, Optional, Callable
 from functools import wraps
 from datetime import datetime, timedelta
 from collections import defaultdict
-from threading import Lock
 
+import numpy as np
 from prometheus_client import (
     Counter, Histogram, Gauge, Info,
     CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
@@ -18,6 +19,12 @@ logger = logging.getLogger(__name__)
 # Create a custom registry
 REGISTRY = CollectorRegistry()
 
+# Most recent request latencies kept for dashboard percentiles
+RESPONSE_TIME_WINDOW = 1000
+
+# Hourly request counters kept (keys are epoch hours)
+HOURLY_WINDOW = 48
+
 # ============================================================================
 # Request Metrics
 # ============================================================================
@@ -37,6 +44,12 @@ REQUEST_LATENCY = Histogram(
     registry=REGISTRY
 )
 
+EVENTS_DROPPED = Counter(
+    'onboarding_events_dropped_total',
+    'Metrics/audit records dropped because the background queue was full',
+    registry=REGISTRY
+)
+
 ACTIVE_REQUESTS = Gauge(
     'onboarding_active_requests',
     'Number of active requests',
@@ -133,10 +146,13 @@ TASK_STATUS_UPDATES = Counter(
     registry=REGISTRY
 )
 
-USER_PROGRESS = Gauge(
+# Distribution per department; per-user progress is queried from the
+# database (a user_id label would add one series per user)
+USER_PROGRESS = Histogram(
     'onboarding_user_progress_percent',
     'User onboarding progress percentage',
-    ['user_id', 'department'],
+    ['department'],
+    buckets=[10, 25, 50, 75, 100],
     registry=REGISTRY
 )
 
@@ -175,6 +191,19 @@ SYSTEM_INFO = Info(
     registry=REGISTRY
 )
 
+DB_POOL_IN_USE = Gauge(
+    'onboarding_db_pool_in_use',
+    'Database connections currently checked out of the pool',
+    registry=REGISTRY
+)
+
+BULK_ROWS_DROPPED = Counter(
+    'onboarding_bulk_rows_dropped_total',
+    'Buffered log rows the bulk writer could not insert',
+    ['table'],
+    registry=REGISTRY
+)
+
 DB_QUERY_LATENCY = Histogram(
     'onboarding_db_query_latency_seconds',
     'Database query latency in seconds',
@@ -189,14 +218,24 @@ class MetricsCollector:
     
     def __init__(self):
         """Initialize the metrics collector."""
-        self._lock = Lock()
         self._start_time = datetime.now()
         
-        # In-memory aggregations for dashboard
+        # In-memory aggregations for dashboard. Request, error and
+        # department totals are read back from the Prometheus counters.
+        # They are updated without a lock: each update is a single dict or
+        # array store under the GIL, and a rare lost increment between
+        # racing threads is acceptable for dashboard figures.
         self._hourly_requests = defaultdict(int)
-        self._department_queries = defaultdict(int)
-        self._response_times: list = []
-        self._error_count = 0
+        # Ring buffer of the last RESPONSE_TIME_WINDOW latencies
+        self._response_times = np.zeros(RESPONSE_TIME_WINDOW, dtype=np.float32)
+        self._request_count = 0
+        
+        # Labelled metric children by label values, so hot paths skip
+        # prometheus_client's label validation and lookup
+        self._request_children: Dict[tuple, tuple] = {}
+        self._chat_children: Dict[tuple, Any] = {}
+        self._agent_children: Dict[tuple, tuple] = {}
+        self._rag_children: Dict[tuple, Any] = {}
         
         # Set system info
         SYSTEM_INFO.info({
@@ -219,23 +258,29 @@ class MetricsCollector:
             status: Response status code.
             latency_seconds: Request latency.
         """
-        REQUEST_COUNT.labels(
-            endpoint=endpoint,
-            method=method,
-            status=str(status)
-        ).inc()
-        
-        REQUEST_LATENCY.labels(endpoint=endpoint).observe(latency_seconds)
+        key = (endpoint, method, status)
+        children = self._request_children.get(key)
+        if children is None:
+            children = self._request_children[key] = (
+                REQUEST_COUNT.labels(endpoint=endpoint, method=method, status=str(status)),
+                REQUEST_LATENCY.labels(endpoint=endpoint),
+            )
+        count, latency = children
+        count.inc()
+        latency.observe(latency_seconds)
         
         # Update in-memory aggregations
-        with self._lock:
-            hour_key = datetime.now().strftime("%Y-%m-%d-%H")
-            self._hourly_requests[hour_key] += 1
-            self._response_times.append(latency_seconds)
-            if len(self._response_times) > 1000:
-                self._response_times = self._response_times[-1000:]
-            if status >= 400:
-                self._error_count += 1
+        hour_key = int(time.time()) // 3600
+        if hour_key not in self._hourly_requests:
+            self._evict_old_hours(hour_key)
+        self._hourly_requests[hour_key] += 1
+        self._response_times[self._request_count % RESPONSE_TIME_WINDOW] = latency_seconds
+        self._request_count += 1
+    
+    def _evict_old_hours(self, current_hour: int):
+        """Drop hourly counters older than HOURLY_WINDOW hours."""
+        for hour in [h for h in list(self._hourly_requests) if h <= current_hour - HOURLY_WINDOW]:
+            self._hourly_requests.pop(hour, None)
     
     def record_chat_message(
         self,
@@ -248,13 +293,14 @@ class MetricsCollector:
             user_type: Type of user (new_hire, admin).
             department: Routed department.
         """
-        CHAT_MESSAGES.labels(
-            user_type=user_type,
-            department=department
-        ).inc()
-        
-        with self._lock:
-            self._department_queries[department] += 1
+        key = (user_type, department)
+        child = self._chat_children.get(key)
+        if child is None:
+            child = self._chat_children[key] = CHAT_MESSAGES.labels(
+                user_type=user_type,
+                department=department
+            )
+        child.inc()
     
     def record_agent_call(
         self,
@@ -269,12 +315,16 @@ class MetricsCollector:
             success: Whether the call succeeded.
             latency_seconds: Agent processing time.
         """
-        AGENT_CALLS.labels(
-            agent_name=agent_name,
-            success=str(success).lower()
-        ).inc()
-        
-        AGENT_LATENCY.labels(agent_name=agent_name).observe(latency_seconds)
+        key = (agent_name, success)
+        children = self._agent_children.get(key)
+        if children is None:
+            children = self._agent_children[key] = (
+                AGENT_CALLS.labels(agent_name=agent_name, success=str(success).lower()),
+                AGENT_LATENCY.labels(agent_name=agent_name),
+            )
+        calls, latency = children
+        calls.inc()
+        latency.observe(latency_seconds)
     
     def record_routing(
         self,
@@ -322,10 +372,14 @@ class MetricsCollector:
             confidence: Confidence score.
             confidence_level: Confidence level string.
         """
-        RAG_QUERIES.labels(
-            department_filter=department_filter or "all",
-            cache_hit=str(cache_hit).lower()
-        ).inc()
+        key = (department_filter, cache_hit)
+        child = self._rag_children.get(key)
+        if child is None:
+            child = self._rag_children[key] = RAG_QUERIES.labels(
+                department_filter=department_filter or "all",
+                cache_hit=str(cache_hit).lower()
+            )
+        child.inc()
         
         RAG_RETRIEVAL_LATENCY.labels(
             search_type=search_type
@@ -362,17 +416,14 @@ class MetricsCollector:
         department: str,
         progress: float
     ):
-        """Set user progress gauge.
+        """Record a user's progress in the department's progress histogram.
         
         Args:
-            user_id: User ID.
+            user_id: User ID (not exported as a label).
             department: Department.
             progress: Progress percentage (0-100).
         """
-        USER_PROGRESS.labels(
-            user_id=str(user_id),
-            department=department
-        ).set(progress)
+        USER_PROGRESS.labels(department=department).observe(progress)
     
     def set_overdue_tasks(self, department: str, count: int):
         """Set overdue tasks gauge.
@@ -389,36 +440,42 @@ class MetricsCollector:
         Returns:
             Dictionary of dashboard metrics.
         """
-        with self._lock:
-            # Calculate percentiles for response times
-            sorted_times = sorted(self._response_times) if self._response_times else [0]
-            p50_idx = int(len(sorted_times) * 0.5)
-            p95_idx = int(len(sorted_times) * 0.95)
-            p99_idx = int(len(sorted_times) * 0.99)
-            
-            uptime = datetime.now() - self._start_time
-            
-            return {
-                "uptime_seconds": uptime.total_seconds(),
-                "total_requests": sum(self._hourly_requests.values()),
-                "error_count": self._error_count,
-                "error_rate": (
-                    self._error_count / max(1, sum(self._hourly_requests.values()))
-                ),
-                "response_times": {
-                    "p50_ms": sorted_times[p50_idx] * 1000 if sorted_times else 0,
-                    "p95_ms": sorted_times[p95_idx] * 1000 if sorted_times else 0,
-                    "p99_ms": sorted_times[p99_idx] * 1000 if sorted_times else 0,
-                    "avg_ms": (
-                        sum(self._response_times) / len(self._response_times) * 1000
-                        if self._response_times else 0
-                    )
-                },
-                "department_queries": dict(self._department_queries),
-                "hourly_requests": dict(
-                    list(self._hourly_requests.items())[-24:]  # Last 24 hours
-                )
+        # Copy before iterating; a recorder may add an hour concurrently
+        hourly_requests = dict(self._hourly_requests)
+        
+        # Percentiles by selection (O(n)) over the filled part of the window
+        times = self._response_times[:min(self._request_count, RESPONSE_TIME_WINDOW)]
+        n = len(times)
+        if n:
+            ranks = [int(n * 0.5), int(n * 0.95), int(n * 0.99)]
+            p50, p95, p99 = np.partition(times, ranks)[ranks].tolist()
+            avg = float(times.mean())
+        else:
+            p50 = p95 = p99 = avg = 0.0
+        
+        uptime = datetime.now() - self._start_time
+        total_requests = _counter_total(REQUEST_COUNT)
+        error_count = _counter_total(
+            REQUEST_COUNT, by=lambda labels: int(labels["status"]) >= 400
+        )
+        
+        return {
+            "uptime_seconds": uptime.total_seconds(),
+            "total_requests": int(total_requests),
+            "error_count": int(error_count),
+            "error_rate": error_count / max(1, total_requests),
+            "response_times": {
+                "p50_ms": p50 * 1000,
+                "p95_ms": p95 * 1000,
+                "p99_ms": p99 * 1000,
+                "avg_ms": avg * 1000
+            },
+            "department_queries": _counter_totals_by(CHAT_MESSAGES, "department"),
+            "hourly_requests": {  # Last 24 hours
+                datetime.fromtimestamp(hour * 3600).strftime("%Y-%m-%d-%H"): count
+                for hour, count in sorted(hourly_requests.items())[-24:]
             }
+        }
     
     def get_prometheus_metrics(self) -> bytes:
         """Get Prometheus-formatted metrics.
@@ -429,15 +486,36 @@ class MetricsCollector:
         return generate_latest(REGISTRY)
 
 
-# Global metrics collector
-_metrics_collector: Optional[MetricsCollector] = None
+def _counter_total(counter: Counter, by: Optional[Callable[[Dict[str, str]], bool]] = None) -> float:
+    """Sum a labelled counter's series, optionally only those matching ``by``."""
+    return sum(
+        sample.value
+        for metric in counter.collect()
+        for sample in metric.samples
+        if sample.name.endswith("_total") and (by is None or by(sample.labels))
+    )
+
+
+def _counter_totals_by(counter: Counter, label: str) -> Dict[str, int]:
+    """Sum a labelled counter's series grouped by one label."""
+    totals: Dict[str, int] = defaultdict(int)
+    for metric in counter.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                totals[sample.labels[label]] += int(sample.value)
+    return dict(totals)
+
+
+# Global metrics collector, created at import so the per-request path
+# needs no lazy-initialization check
+_metrics_collector = MetricsCollector()
+
+# Bound method for the request middleware's hot path
+record_request = _metrics_collector.record_request
 
 
 def get_metrics_collector() -> MetricsCollector:
     """Get the global metrics collector instance."""
-    global _metrics_collector
-    if _metrics_collector is None:
-        _metrics_collector = MetricsCollector()
     return _metrics_collector
 
 
@@ -448,35 +526,28 @@ def track_time(metric_name: str = None):
         metric_name: Optional name for the metric.
     """
     def decorator(func: Callable):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            start = time.time()
-            try:
-                result = await func(*args, **kwargs)
-                return result
-            finally:
-                elapsed = time.time() - start
-                logger.debug(f"{func.__name__} took {elapsed*1000:.2f}ms")
+        # Pick the wrapper once, at decoration time
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    logger.debug("%s took %.2fms", func.__name__, elapsed * 1000)
+            
+            return async_wrapper
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start = time.time()
+            start = time.perf_counter()
             try:
-                result = func(*args, **kwargs)
-                return result
+                return func(*args, **kwargs)
             finally:
-                elapsed = time.time() - start
-                logger.debug(f"{func.__name__} took {elapsed*1000:.2f}ms")
+                elapsed = time.perf_counter() - start
+                logger.debug("%s took %.2fms", func.__name__, elapsed * 1000)
         
-        if asyncio_iscoroutinefunction(func):
-            return async_wrapper
         return sync_wrapper
     
     return decorator
-
-
-def asyncio_iscoroutinefunction(func):
-    """Check if function is a coroutine function."""
-    import asyncio
-    return asyncio.iscoroutinefunction(func)
-
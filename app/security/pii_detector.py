@@ -1,12 +1,47 @@
 """PII Detection and Redaction module."""
-import re
 import logging
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, field
+import threading
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence, Tuple, Optional
+from dataclasses import dataclass
 from enum import Enum
 
+from cachetools import LRUCache
+
+try:
+    # Releases the GIL while matching, so concurrent detect() calls scale
+    import regex as re
+    HAS_REGEX = True
+except ImportError:
+    import re
+    HAS_REGEX = False
+
+try:
+    # SIMD multi-pattern pre-screen (Linux x86-64 builds only)
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
 logger = logging.getLogger(__name__)
 
+# Matching options: with ``regex``, match without holding the GIL
+_MATCH_OPTIONS = {"concurrent": True} if HAS_REGEX else {}
+
+_DIGIT = re.compile(r'\d')
+
+# Possessive "+" after a quantifier; Hyperscan only has greedy quantifiers
+_POSSESSIVE = re.compile(r'(?<=[?*+}])\+')
+
+# Detection results kept per detector, keyed by text
+DETECT_CACHE_SIZE = 4096
+
+# Longer texts (documents, not chat messages) are not cached
+DETECT_CACHE_MAX_LENGTH = 2048
+
+# Shortest text any built-in pattern can match ("a@b.cd")
+MIN_PII_LENGTH = 6
+
 
 class PIIType(str, Enum):
     """Types of PII that can be detected."""
@@ -22,7 +57,7 @@ class PIIType(str, Enum):
     NAME = "name"
 
 
-@dataclass
+@dataclass(slots=True)
 class PIIMatch:
     """A detected PII match."""
     pii_type: PIIType
@@ -33,44 +68,59 @@ class PIIMatch:
     confidence: float = 1.0
 
 
-@dataclass
+@dataclass(slots=True)
 class PIIDetectionResult:
-    """Result of PII detection."""
+    """Result of PII detection.
+    
+    Results without PII share empty tuples for ``matches`` and
+    ``pii_types_found``; results are read-only.
+    """
     original_text: str
     redacted_text: str
-    matches: List[PIIMatch] = field(default_factory=list)
+    matches: Sequence[PIIMatch] = ()
     pii_found: bool = False
-    pii_types_found: List[PIIType] = field(default_factory=list)
+    pii_types_found: Sequence[PIIType] = ()
+
+
+# Returned for empty input
+_EMPTY_RESULT = PIIDetectionResult(original_text="", redacted_text="")
 
 
 class PIIDetector:
     """Detects and redacts PII from text."""
     
-    # Regex patterns for various PII types
+    # Regex patterns for various PII types. All patterns are combined into
+    # one alternation and tried in this order at each position, so the more
+    # specific formats come before the generic digit runs (phone, passport).
+    # Separators and digit runs use possessive quantifiers (?+, {m,n}+)
+    # where giving characters back can never produce a match, and repeated
+    # groups are written out, which caps backtracking on long digit strings.
+    # Phone numbers with and without an area code are explicit alternatives
+    # rather than nested optional groups.
     PATTERNS = {
         PIIType.EMAIL: (
             r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
             "[EMAIL_REDACTED]"
         ),
-        PIIType.PHONE: (
-            r'\b(?:\+1[-.\s]?)?(?:\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}\b',
-            "[PHONE_REDACTED]"
+        PIIType.CREDIT_CARD: (
+            r'\b\d{4}[-\s]?+\d{4}[-\s]?+\d{4}[-\s]?+\d{4}\b',
+            "[CC_REDACTED]"
         ),
         PIIType.SSN: (
-            r'\b\d{3}[-\s]?\d{2}[-\s]?\d{4}\b',
+            r'\b\d{3}[-\s]?+\d{2}[-\s]?+\d{4}\b',
             "[SSN_REDACTED]"
         ),
-        PIIType.CREDIT_CARD: (
-            r'\b(?:\d{4}[-\s]?){3}\d{4}\b',
-            "[CC_REDACTED]"
+        PIIType.DATE_OF_BIRTH: (
+            r'\b(?:0[1-9]|1[0-2]|[1-9])[/\-](?:0[1-9]|[12]\d|3[01]|[1-9])[/\-](?:19|20)\d{2}\b',
+            "[DOB_REDACTED]"
         ),
         PIIType.IP_ADDRESS: (
-            r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
+            r'\b\d{1,3}+\.\d{1,3}+\.\d{1,3}+\.\d{1,3}+\b',
             "[IP_REDACTED]"
         ),
-        PIIType.DATE_OF_BIRTH: (
-            r'\b(?:0?[1-9]|1[0-2])[/\-](?:0?[1-9]|[12]\d|3[01])[/\-](?:19|20)\d{2}\b',
-            "[DOB_REDACTED]"
+        PIIType.PHONE: (
+            r'\b(?:\+1[-.\s]?+)?(?:\(?+\d{3}\)?+[-.\s]?+\d{3}|\d{3})[-.\s]?+\d{4}\b',
+            "[PHONE_REDACTED]"
         ),
         PIIType.PASSPORT: (
             r'\b[A-Z]{1,2}\d{6,9}\b',
@@ -80,10 +130,7 @@ class PIIDetector:
     
     # Common name prefixes and patterns
     NAME_PATTERNS = [
-        (r'\bMr\.?\s+[A-Z][a-z]+\s+[A-Z][a-z]+\b', "[NAME_REDACTED]"),
-        (r'\bMrs\.?\s+[A-Z][a-z]+\s+[A-Z][a-z]+\b', "[NAME_REDACTED]"),
-        (r'\bMs\.?\s+[A-Z][a-z]+\s+[A-Z][a-z]+\b', "[NAME_REDACTED]"),
-        (r'\bDr\.?\s+[A-Z][a-z]+\s+[A-Z][a-z]+\b', "[NAME_REDACTED]"),
+        (r'\b(?:Mrs?|Ms|Dr)\.?\s+[A-Z][a-z]+\s+[A-Z][a-z]+\b', "[NAME_REDACTED]"),
     ]
     
     # Address patterns
@@ -94,125 +141,304 @@ class PIIDetector:
          "[ADDRESS_REDACTED]"),
     ]
     
+    # Cheap pre-screen: every match of these types contains one of the
+    # substrings (names are matched case-sensitively)...
+    SENTINELS = {
+        PIIType.EMAIL: ("@",),
+        PIIType.NAME: ("Mr", "Ms", "Dr"),
+    }
+    
+    # ...and every match of these types contains a digit
+    DIGIT_TYPES = frozenset({
+        PIIType.CREDIT_CARD, PIIType.SSN, PIIType.DATE_OF_BIRTH,
+        PIIType.IP_ADDRESS, PIIType.PHONE, PIIType.PASSPORT, PIIType.ADDRESS,
+    })
+    
     def __init__(
         self,
         enabled_types: List[PIIType] = None,
-        custom_patterns: Dict[str, Tuple[str, str]] = None
+        custom_patterns: Dict[str, Tuple[str, str]] = None,
+        cache_size: int = DETECT_CACHE_SIZE
     ):
         """Initialize the PII detector.
         
         Args:
             enabled_types: List of PII types to detect. Defaults to all.
             custom_patterns: Custom regex patterns to add.
+            cache_size: Number of detection results to keep (0 disables).
         """
         if enabled_types is None:
             enabled_types = list(PIIType)
         
         self.enabled_types = enabled_types
-        self._compiled_patterns: Dict[PIIType, Tuple[re.Pattern, str]] = {}
         
-        # Compile patterns
-        for pii_type, (pattern, replacement) in self.PATTERNS.items():
-            if pii_type in enabled_types:
-                self._compiled_patterns[pii_type] = (
-                    re.compile(pattern, re.IGNORECASE),
-                    replacement
-                )
+        # Compiled once per configuration and shared between detectors
+        self._master_pattern, self._master_bytes, self._group_info = self._compile_master(
+            frozenset(enabled_types),
+            tuple(custom_patterns.items()) if custom_patterns else ()
+        )
         
-        # Add custom patterns
-        if custom_patterns:
-            for name, (pattern, replacement) in custom_patterns.items():
-                self._compiled_patterns[name] = (
-                    re.compile(pattern, re.IGNORECASE),
-                    replacement
-                )
+        # Texts without any sentinel can skip the regex scan; custom
+        # patterns have no known sentinel, so they always scan
+        self._always_scan = bool(custom_patterns)
+        self._digit_gated = any(t in self.DIGIT_TYPES for t in enabled_types)
+        self._sentinels = tuple(
+            sentinel
+            for pii_type, sentinels in self.SENTINELS.items() if pii_type in enabled_types
+            for sentinel in sentinels
+        )
+        
+        # Texts that pass the sentinel check are confirmed by Hyperscan
+        # before the (much slower) master pattern runs
+        self._prefilter = None
+        if HAS_HYPERSCAN and not custom_patterns:
+            self._prefilter = self._compile_prefilter(frozenset(enabled_types))
+        self._scratch = threading.local()
         
-        # Compile name and address patterns
-        self._name_patterns = [
-            (re.compile(p), r) for p, r in self.NAME_PATTERNS
+        # Repeated texts (common questions, retried requests) reuse results
+        self._cache: Optional[LRUCache] = LRUCache(maxsize=cache_size) if cache_size else None
+        self._cache_lock = threading.Lock()
+    
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _compile_master(
+        cls,
+        enabled_types: FrozenSet[PIIType],
+        custom_patterns: Tuple[Tuple[str, Tuple[str, str]], ...]
+    ) -> Tuple[Optional[re.Pattern], Optional[re.Pattern], Dict[str, Tuple[PIIType, str, float]]]:
+        """Build the master patterns and their group lookup for a configuration.
+        
+        Every pattern becomes a named group in one alternation, so a single
+        pass finds every match and ``match.lastgroup`` says which one. The
+        alternation is compiled twice: for ``str`` input and, when it is
+        pure ASCII, for ASCII-encoded ``bytes`` input.
+        """
+        # (pattern, case-sensitive, pii_type, replacement, confidence) in
+        # alternation order
+        alternatives = [
+            (pattern, False, pii_type, replacement, 1.0)
+            for pii_type, (pattern, replacement) in cls.PATTERNS.items()
+            if pii_type in enabled_types
         ]
-        self._address_patterns = [
-            (re.compile(p, re.IGNORECASE), r) for p, r in self.ADDRESS_PATTERNS
+        alternatives.extend(
+            (pattern, False, name, replacement, 1.0)
+            for name, (pattern, replacement) in custom_patterns
+        )
+        if PIIType.NAME in enabled_types:
+            alternatives.extend(
+                (pattern, True, PIIType.NAME, replacement, 0.8)  # Lower confidence for names
+                for pattern, replacement in cls.NAME_PATTERNS
+            )
+        if PIIType.ADDRESS in enabled_types:
+            alternatives.extend(
+                (pattern, False, PIIType.ADDRESS, replacement, 0.7)
+                for pattern, replacement in cls.ADDRESS_PATTERNS
+            )
+        
+        groups = []
+        group_info: Dict[str, Tuple[PIIType, str, float]] = {}
+        for index, (pattern, case_sensitive, pii_type, replacement, confidence) in enumerate(alternatives):
+            name = f"p{index}"
+            if case_sensitive:
+                pattern = f"(?-i:{pattern})"
+            groups.append(f"(?P<{name}>{pattern})")
+            group_info[name] = (pii_type, replacement, confidence)
+        if not groups:
+            return None, None, group_info
+        
+        master = "|".join(groups)
+        master_bytes = None
+        if master.isascii():
+            # On ASCII text \b, \d and case folding agree with the str pattern
+            master_bytes = re.compile(master.encode("ascii"), re.IGNORECASE)
+        return re.compile(master, re.IGNORECASE), master_bytes, group_info
+    
+    @classmethod
+    @lru_cache(maxsize=32)
+    def _compile_prefilter(cls, enabled_types: FrozenSet[PIIType]) -> Optional["hyperscan.Database"]:
+        """Build a Hyperscan database that reports whether any enabled
+        built-in pattern matches.
+        
+        Possessive quantifiers become greedy, which can only add matches,
+        so the database never misses ASCII text the master pattern would
+        match. Its word boundaries and digit classes are ASCII-only, so
+        non-ASCII text skips it.
+        """
+        alternatives = [
+            (pattern, False)
+            for pii_type, (pattern, _) in cls.PATTERNS.items()
+            if pii_type in enabled_types
         ]
+        if PIIType.NAME in enabled_types:
+            alternatives.extend((pattern, True) for pattern, _ in cls.NAME_PATTERNS)
+        if PIIType.ADDRESS in enabled_types:
+            alternatives.extend((pattern, False) for pattern, _ in cls.ADDRESS_PATTERNS)
+        if not alternatives:
+            return None
+        
+        base_flags = hyperscan.HS_FLAG_SINGLEMATCH
+        database = hyperscan.Database()
+        try:
+            database.compile(
+                expressions=[_POSSESSIVE.sub("", pattern).encode() for pattern, _ in alternatives],
+                ids=list(range(len(alternatives))),
+                elements=len(alternatives),
+                flags=[
+                    base_flags if case_sensitive else base_flags | hyperscan.HS_FLAG_CASELESS
+                    for _, case_sensitive in alternatives
+                ]
+            )
+        except hyperscan.error as e:
+            logger.warning(f"Hyperscan pre-screen disabled: {e}")
+            return None
+        return database
+    
+    def _prefilter_match(self, text: str) -> bool:
+        """Whether the Hyperscan database matches anywhere in ASCII ``text``."""
+        # Scratch space cannot be shared between concurrent scans
+        scratch = getattr(self._scratch, "scratch", None)
+        if scratch is None:
+            scratch = self._scratch.scratch = hyperscan.Scratch(self._prefilter)
+        
+        found = False
+        
+        def on_match(pattern_id, start, end, flags, context) -> bool:
+            nonlocal found
+            found = True
+            return True  # Stop at the first match
+        
+        try:
+            self._prefilter.scan(text.encode("ascii"), match_event_handler=on_match, scratch=scratch)
+        except hyperscan.error:
+            return True
+        return found
+    
+    def _may_contain_pii(self, text: str) -> bool:
+        """Whether any enabled pattern could match (substring/digit scans,
+        then Hyperscan when available)."""
+        if self._always_scan:
+            return True
+        if not (
+            (self._digit_gated and _DIGIT.search(text))
+            or any(sentinel in text for sentinel in self._sentinels)
+        ):
+            return False
+        if self._prefilter is None or not text.isascii():
+            return True
+        return self._prefilter_match(text)
     
     def detect(self, text: str) -> PIIDetectionResult:
         """Detect PII in text.
         
+        Matches do not overlap: at each position the first pattern (in
+        alternation order) that matches wins. They are listed in text order.
+        Results for short texts are cached and shared, so treat them as
+        read-only.
+        
         Args:
             text: Text to scan for PII.
             
         Returns:
             PIIDetectionResult with matches and redacted text.
         """
+        if text and len(text) < MIN_PII_LENGTH and not self._always_scan:
+            # IDs, labels and the like: too short for any built-in pattern
+            return PIIDetectionResult(original_text=text, redacted_text=text)
+        if not text or self._cache is None or len(text) > DETECT_CACHE_MAX_LENGTH:
+            return self._detect(text)
+        
+        with self._cache_lock:
+            result = self._cache.get(text)
+        if result is None:
+            result = self._detect(text)
+            with self._cache_lock:
+                self._cache[text] = result
+        return result
+    
+    def _detect(self, text: str) -> PIIDetectionResult:
+        """Run detection and redaction (uncached)."""
         if not text:
-            return PIIDetectionResult(
-                original_text="",
-                redacted_text="",
-                pii_found=False
-            )
+            return _EMPTY_RESULT
+        if self._master_pattern is None or not self._may_contain_pii(text):
+            # Most messages: no lists to build, nothing to redact
+            return PIIDetectionResult(original_text=text, redacted_text=text)
         
         matches: List[PIIMatch] = []
+        # Unique types in first-seen order
+        types_seen: Dict[PIIType, None] = {}
         
-        # Check each pattern
-        for pii_type, (pattern, replacement) in self._compiled_patterns.items():
-            for match in pattern.finditer(text):
+        if self._master_bytes is not None and text.isascii():
+            redacted_text = self._redact_ascii(text, matches, types_seen)
+        else:
+            def replace(match) -> str:
+                pii_type, replacement, confidence = self._group_info[match.lastgroup]
                 matches.append(PIIMatch(
                     pii_type=pii_type,
                     original=match.group(),
                     start=match.start(),
                     end=match.end(),
-                    redacted=replacement
+                    redacted=replacement,
+                    confidence=confidence
                 ))
+                types_seen[pii_type] = None
+                return replacement
+            
+            # One pass builds the redacted text and collects the matches
+            redacted_text = self._master_pattern.sub(replace, text, **_MATCH_OPTIONS)
         
-        # Check name patterns if enabled
-        if PIIType.NAME in self.enabled_types:
-            for pattern, replacement in self._name_patterns:
-                for match in pattern.finditer(text):
-                    matches.append(PIIMatch(
-                        pii_type=PIIType.NAME,
-                        original=match.group(),
-                        start=match.start(),
-                        end=match.end(),
-                        redacted=replacement,
-                        confidence=0.8  # Lower confidence for name detection
-                    ))
-        
-        # Check address patterns if enabled
-        if PIIType.ADDRESS in self.enabled_types:
-            for pattern, replacement in self._address_patterns:
-                for match in pattern.finditer(text):
-                    matches.append(PIIMatch(
-                        pii_type=PIIType.ADDRESS,
-                        original=match.group(),
-                        start=match.start(),
-                        end=match.end(),
-                        redacted=replacement,
-                        confidence=0.7
-                    ))
-        
-        # Sort matches by start position (descending) for redaction
-        matches.sort(key=lambda m: m.start, reverse=True)
-        
-        # Apply redactions
-        redacted_text = text
-        for match in matches:
-            redacted_text = (
-                redacted_text[:match.start] +
-                match.redacted +
-                redacted_text[match.end:]
-            )
-        
-        # Get unique PII types found
-        pii_types_found = list(set(m.pii_type for m in matches))
-        
+        if not matches:
+            return PIIDetectionResult(original_text=text, redacted_text=redacted_text)
         return PIIDetectionResult(
             original_text=text,
             redacted_text=redacted_text,
             matches=matches,
-            pii_found=len(matches) > 0,
-            pii_types_found=pii_types_found
+            pii_found=True,
+            pii_types_found=list(types_seen)
         )
     
+    def _redact_ascii(
+        self,
+        text: str,
+        matches: List[PIIMatch],
+        types_seen: Dict[PIIType, None]
+    ) -> str:
+        """Redact ASCII text using the bytes pattern, appending to ``matches``
+        and ``types_seen``.
+        
+        The bytes engine skips the Unicode character lookups of the str
+        engine, and for ASCII byte offsets are character offsets.
+        """
+        def replace(match) -> bytes:
+            pii_type, replacement, confidence = self._group_info[match.lastgroup]
+            matches.append(PIIMatch(
+                pii_type=pii_type,
+                original=match.group().decode("ascii"),
+                start=match.start(),
+                end=match.end(),
+                redacted=replacement,
+                confidence=confidence
+            ))
+            types_seen[pii_type] = None
+            return replacement.encode()
+        
+        redacted = self._master_bytes.sub(replace, text.encode("ascii"), **_MATCH_OPTIONS)
+        return redacted.decode()
+    
+    def detect_batch(self, texts: List[str]) -> List[PIIDetectionResult]:
+        """Detect PII in several texts, such as the messages of a conversation.
+        
+        Each text gets its own pre-screen and cache lookup, so texts without
+        PII never reach the regex scan.
+        
+        Args:
+            texts: Texts to scan for PII.
+            
+        Returns:
+            One PIIDetectionResult per text, in order.
+        """
+        detect = self.detect
+        return [detect(text) for text in texts]
+    
     def redact(self, text: str) -> str:
         """Redact PII from text.
         
@@ -222,8 +448,28 @@ class PIIDetector:
         Returns:
             Redacted text.
         """
-        result = self.detect(text)
-        return result.redacted_text
+        if text and len(text) < MIN_PII_LENGTH and not self._always_scan:
+            return text
+        if self._cache is not None and text and len(text) <= DETECT_CACHE_MAX_LENGTH:
+            with self._cache_lock:
+                result = self._cache.get(text)
+            if result is not None:
+                return result.redacted_text
+        if not text or self._master_pattern is None or not self._may_contain_pii(text):
+            return text
+        
+        # Redaction alone needs no PIIMatch objects, only the replacements
+        group_info = self._group_info
+        if self._master_bytes is not None and text.isascii():
+            redacted = self._master_bytes.sub(
+                lambda match: group_info[match.lastgroup][1].encode(),
+                text.encode("ascii"),
+                **_MATCH_OPTIONS
+            )
+            return redacted.decode()
+        return self._master_pattern.sub(
+            lambda match: group_info[match.lastgroup][1], text, **_MATCH_OPTIONS
+        )
     
     def contains_pii(self, text: str) -> bool:
         """Check if text contains PII.
@@ -234,8 +480,14 @@ class PIIDetector:
         Returns:
             True if PII is found.
         """
-        result = self.detect(text)
-        return result.pii_found
+        if not text or (len(text) < MIN_PII_LENGTH and not self._always_scan):
+            return False
+        if self._master_pattern is None or not self._may_contain_pii(text):
+            return False
+        # The first match answers the question; no matches or redaction needed
+        if self._master_bytes is not None and text.isascii():
+            return self._master_bytes.search(text.encode("ascii"), **_MATCH_OPTIONS) is not None
+        return self._master_pattern.search(text, **_MATCH_OPTIONS) is not None
 
 
 # Global PII detector instance
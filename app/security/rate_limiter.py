@@ -1,13 +1,37 @@
 """Rate limiting module for API protection."""
 import time
 import logging
-from typing import Dict, Optional, Tuple
+from array import array
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from threading import Lock
-from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Independently locked partitions of the bucket table (a power of two)
+LOCK_SHARDS = 64
+
+
+def _wall_time(moment: float, now: float) -> float:
+    """Convert a ``time.monotonic()`` moment to a Unix timestamp, given ``now``."""
+    return time.time() + (moment - now)
+
+
+@dataclass(slots=True)
+class _Bucket:
+    """Per-identifier limiter state.
+    
+    The sliding window is kept as request counts per whole second in a ring
+    of ``window_seconds`` slots (second ``s`` lives in slot
+    ``s % window_seconds``) plus their running total, instead of one
+    timestamp per request.
+    """
+    tokens: float
+    last_update: float  # time.monotonic() of the last refill
+    slots: array
+    slot_epoch: int  # Latest second the ring reflects
+    window_count: int = 0
+
 
 @dataclass
 class RateLimitResult:
@@ -38,39 +62,70 @@ class RateLimiter:
         self.burst_size = burst_size
         self.window_seconds = window_seconds
         
-        # Per-user token buckets
-        self._buckets: Dict[str, Dict] = defaultdict(lambda: {
-            "tokens": burst_size,
-            "last_update": time.time(),
-            "request_times": []
-        })
-        self._lock = Lock()
+        # Per-user token buckets, sharded by identifier so checks for
+        # different users don't contend on one lock
+        self._shards: List[Tuple[Lock, Dict[str, _Bucket]]] = [
+            (Lock(), {}) for _ in range(LOCK_SHARDS)
+        ]
         
         # Rate at which tokens are added (per second)
         self._refill_rate = requests_per_minute / 60.0
     
-    def _refill_bucket(self, bucket: Dict) -> None:
+    def _make_bucket(self, now: float) -> _Bucket:
+        """Create a full token bucket."""
+        return _Bucket(
+            tokens=float(self.burst_size),
+            last_update=now,
+            slots=array("i", bytes(4 * self.window_seconds)),
+            slot_epoch=int(now)
+        )
+    
+    def _shard(self, identifier: str) -> Tuple[Lock, Dict[str, _Bucket]]:
+        """Get the lock and bucket table responsible for an identifier."""
+        return self._shards[hash(identifier) & (LOCK_SHARDS - 1)]
+    
+    def _get_bucket(self, buckets: Dict[str, _Bucket], identifier: str, now: float) -> _Bucket:
+        """Get an identifier's bucket, creating it on first use (shard lock held)."""
+        bucket = buckets.get(identifier)
+        if bucket is None:
+            bucket = buckets[identifier] = self._make_bucket(now)
+        return bucket
+    
+    def _refill_bucket(self, bucket: _Bucket, now: float) -> None:
         """Refill tokens based on elapsed time.
         
         Args:
             bucket: The token bucket to refill.
+            now: Current ``time.monotonic()`` reading.
         """
-        now = time.time()
-        elapsed = now - bucket["last_update"]
+        elapsed = now - bucket.last_update
         
         # Add tokens based on elapsed time
         tokens_to_add = elapsed * self._refill_rate
-        bucket["tokens"] = min(
+        bucket.tokens = min(
             self.burst_size,
-            bucket["tokens"] + tokens_to_add
+            bucket.tokens + tokens_to_add
         )
-        bucket["last_update"] = now
+        bucket.last_update = now
         
-        # Clean up old request times
-        bucket["request_times"] = [
-            t for t in bucket["request_times"]
-            if now - t < self.window_seconds
-        ]
+        # Advance the window ring, expiring the seconds that fell out of it
+        second = int(now)
+        epoch = bucket.slot_epoch
+        if second > epoch:
+            slots = bucket.slots
+            for expired in range(epoch + 1, min(second, epoch + self.window_seconds) + 1):
+                index = expired % self.window_seconds
+                bucket.window_count -= slots[index]
+                slots[index] = 0
+            bucket.slot_epoch = second
+    
+    def _window_start(self, bucket: _Bucket) -> Optional[int]:
+        """Second of the oldest request still in the window, if any."""
+        slots = bucket.slots
+        for second in range(bucket.slot_epoch - self.window_seconds + 1, bucket.slot_epoch + 1):
+            if slots[second % self.window_seconds]:
+                return second
+        return None
     
     def check(self, identifier: str) -> RateLimitResult:
         """Check if a request is allowed.
@@ -81,57 +136,56 @@ class RateLimiter:
         Returns:
             RateLimitResult indicating if request is allowed.
         """
-        with self._lock:
-            bucket = self._buckets[identifier]
-            self._refill_bucket(bucket)
-            
-            now = time.time()
+        # Bucket times are monotonic (immune to wall-clock adjustments) and
+        # read once per check; reset_at is converted to wall time on the way out
+        now = time.monotonic()
+        lock, buckets = self._shard(identifier)
+        with lock:
+            bucket = self._get_bucket(buckets, identifier, now)
+            self._refill_bucket(bucket, now)
             
             # Check sliding window limit
-            recent_requests = len(bucket["request_times"])
+            recent_requests = bucket.window_count
             if recent_requests >= self.requests_per_minute:
-                oldest_request = min(bucket["request_times"])
-                reset_at = oldest_request + self.window_seconds
+                reset_at = self._window_start(bucket) + self.window_seconds
                 retry_after = reset_at - now
                 
                 return RateLimitResult(
                     allowed=False,
                     remaining=0,
-                    reset_at=reset_at,
+                    reset_at=_wall_time(reset_at, now),
                     retry_after=retry_after
                 )
             
             # Check token bucket
-            if bucket["tokens"] < 1:
-                tokens_needed = 1 - bucket["tokens"]
+            if bucket.tokens < 1:
+                tokens_needed = 1 - bucket.tokens
                 retry_after = tokens_needed / self._refill_rate
                 
                 return RateLimitResult(
                     allowed=False,
                     remaining=0,
-                    reset_at=now + retry_after,
+                    reset_at=_wall_time(now + retry_after, now),
                     retry_after=retry_after
                 )
             
             # Request allowed - consume a token
-            bucket["tokens"] -= 1
-            bucket["request_times"].append(now)
+            bucket.tokens -= 1
+            bucket.slots[bucket.slot_epoch % self.window_seconds] += 1
+            bucket.window_count += 1
             
             remaining = min(
-                int(bucket["tokens"]),
-                self.requests_per_minute - len(bucket["request_times"])
+                int(bucket.tokens),
+                self.requests_per_minute - bucket.window_count
             )
             
-            # Calculate reset time (when the oldest request expires)
-            if bucket["request_times"]:
-                reset_at = min(bucket["request_times"]) + self.window_seconds
-            else:
-                reset_at = now + self.window_seconds
+            # Calculate reset time (when the oldest request's second expires)
+            reset_at = self._window_start(bucket) + self.window_seconds
             
             return RateLimitResult(
                 allowed=True,
                 remaining=remaining,
-                reset_at=reset_at
+                reset_at=_wall_time(reset_at, now)
             )
     
     def get_usage(self, identifier: str) -> Dict:
@@ -143,13 +197,20 @@ class RateLimiter:
         Returns:
             Usage statistics.
         """
-        with self._lock:
-            bucket = self._buckets[identifier]
-            self._refill_bucket(bucket)
+        now = time.monotonic()
+        lock, buckets = self._shard(identifier)
+        with lock:
+            # Read-only: an identifier without a bucket has a full one
+            bucket = buckets.get(identifier)
+            if bucket is None:
+                tokens, requests_in_window = float(self.burst_size), 0
+            else:
+                self._refill_bucket(bucket, now)
+                tokens, requests_in_window = bucket.tokens, bucket.window_count
             
             return {
-                "tokens_available": bucket["tokens"],
-                "requests_in_window": len(bucket["request_times"]),
+                "tokens_available": tokens,
+                "requests_in_window": requests_in_window,
                 "limit_per_minute": self.requests_per_minute,
                 "burst_size": self.burst_size
             }
@@ -160,14 +221,15 @@ class RateLimiter:
         Args:
             identifier: Unique identifier.
         """
-        with self._lock:
-            if identifier in self._buckets:
-                del self._buckets[identifier]
+        lock, buckets = self._shard(identifier)
+        with lock:
+            buckets.pop(identifier, None)
     
     def reset_all(self) -> None:
         """Reset all rate limits."""
-        with self._lock:
-            self._buckets.clear()
+        for lock, buckets in self._shards:
+            with lock:
+                buckets.clear()
 
 
 class TieredRateLimiter:
@@ -1,16 +1,62 @@
-"""Application services."""
-from .feedback import FeedbackService
-from .semantic_cache import SemanticCacheService
-from .query_processor import QueryProcessor, get_query_processor
-from .intent_detector import IntentDetector, get_intent_detector
-from .escalation import EscalationService, get_escalation_service
-from .i18n import TranslationService, get_translation_service, t, Language
-from .faq_service import FAQService
-from .achievements import AchievementService
-from .churn_prediction import ChurnPredictionService
-from .workflows import WorkflowService, initialize_default_workflows
-from .training import TrainingService
-from .calendar_service import CalendarService
+"""Application services.
+
+Services are imported on first access (PEP 562), so importing one service
+does not pull in the LLM and database clients of all the others.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .feedback import FeedbackService
+    from .semantic_cache import SemanticCacheService
+    from .query_processor import QueryProcessor, get_query_processor
+    from .intent_detector import IntentDetector, get_intent_detector
+    from .escalation import EscalationService, get_escalation_service
+    from .i18n import TranslationService, get_translation_service, t, Language
+    from .faq_service import FAQService
+    from .achievements import AchievementService
+    from .churn_prediction import ChurnPredictionService
+    from .workflows import WorkflowService, initialize_default_workflows
+    from .training import TrainingService
+    from .calendar_service import CalendarService
+
+# Exported name -> submodule that defines it
+_LAZY_IMPORTS = {
+    "FeedbackService": ".feedback",
+    "SemanticCacheService": ".semantic_cache",
+    "QueryProcessor": ".query_processor",
+    "get_query_processor": ".query_processor",
+    "IntentDetector": ".intent_detector",
+    "get_intent_detector": ".intent_detector",
+    "EscalationService": ".escalation",
+    "get_escalation_service": ".escalation",
+    "TranslationService": ".i18n",
+    "get_translation_service": ".i18n",
+    "t": ".i18n",
+    "Language": ".i18n",
+    "FAQService": ".faq_service",
+    "AchievementService": ".achievements",
+    "ChurnPredictionService": ".churn_prediction",
+    "WorkflowService": ".workflows",
+    "initialize_default_workflows": ".workflows",
+    "TrainingService": ".training",
+    "CalendarService": ".calendar_service",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Later lookups find the name directly and skip this hook
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     "FeedbackService",
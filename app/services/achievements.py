@@ -1,140 +1,180 @@
 """Achievement and gamification service."""
 import logging
+import threading
+from collections import defaultdict
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy.orm import Session, contains_eager, lazyload
+from sqlalchemy import and_, func, insert
 
 from app.database.models import (
     Achievement, UserAchievement, AchievementCategory,
-    User, Task, TaskStatus, Message, TrainingProgress
+    User, Task, TaskStatus, TrainingProgress, TrainingModule
 )
 
 logger = logging.getLogger(__name__)
 
+# Seconds the active achievement definitions are reused before a reload
+ACHIEVEMENT_CACHE_TTL = 300
+
+_ACTIVE_KEY = "active"
+_active_achievements: TTLCache = TTLCache(maxsize=1, ttl=ACHIEVEMENT_CACHE_TTL)
+_active_achievements_lock = threading.Lock()
+
+
+# Criterion types evaluated from the task and training aggregates; the other
+# types read counters on the user row
+_TASK_CRITERIA = frozenset({
+    "tasks_completed", "all_tasks_completed", "onboarding_speed", "early_completion"
+})
+_TRAINING_CRITERIA = frozenset({"all_training_completed", "quiz_perfect_score"})
+
+
+def invalidate_achievement_cache():
+    """Drop the cached achievement definitions (call after changing them)."""
+    with _active_achievements_lock:
+        _active_achievements.clear()
+
+
+@dataclass(frozen=True, slots=True)
+class _DefaultAchievement:
+    """A built-in achievement definition (seeded by ``initialize_achievements``)."""
+    name: str
+    name_ar: str
+    description: str
+    description_ar: str
+    icon: str
+    category: AchievementCategory
+    points: int
+    criteria: Dict[str, Any]
+
+
 # Default achievements
-DEFAULT_ACHIEVEMENTS = [
-    {
-        "name": "First Steps",
-        "name_ar": "الخطوات الأولى",
-        "description": "Complete your first onboarding task",
-        "description_ar": "أكمل مهمة الإعداد الأولى",
-        "icon": "🎯",
-        "category": AchievementCategory.ONBOARDING,
-        "points": 10,
-        "criteria": {"type": "tasks_completed", "count": 1}
-    },
-    {
-        "name": "Getting Started",
-        "name_ar": "البداية",
-        "description": "Complete 5 onboarding tasks",
-        "description_ar": "أكمل 5 مهام إعداد",
-        "icon": "⭐",
-        "category": AchievementCategory.ONBOARDING,
-        "points": 25,
-        "criteria": {"type": "tasks_completed", "count": 5}
-    },
-    {
-        "name": "Onboarding Pro",
-        "name_ar": "محترف الإعداد",
-        "description": "Complete all onboarding tasks",
-        "description_ar": "أكمل جميع مهام الإعداد",
-        "icon": "🏆",
-        "category": AchievementCategory.ONBOARDING,
-        "points": 100,
-        "criteria": {"type": "all_tasks_completed"}
-    },
-    {
-        "name": "Quick Learner",
-        "name_ar": "سريع التعلم",
-        "description": "Complete onboarding within first week",
-        "description_ar": "أكمل الإعداد خلال الأسبوع الأول",
-        "icon": "⚡",
-        "category": AchievementCategory.SPEED,
-        "points": 50,
-        "criteria": {"type": "onboarding_speed", "days": 7}
-    },
-    {
-        "name": "Curious Mind",
-        "name_ar": "عقل فضولي",
-        "description": "Ask 10 questions to the assistant",
-        "description_ar": "اسأل 10 أسئلة للمساعد",
-        "icon": "❓",
-        "category": AchievementCategory.ENGAGEMENT,
-        "points": 15,
-        "criteria": {"type": "questions_asked", "count": 10}
-    },
-    {
-        "name": "Knowledge Seeker",
-        "name_ar": "باحث عن المعرفة",
-        "description": "Ask 50 questions to the assistant",
-        "description_ar": "اسأل 50 سؤالاً للمساعد",
-        "icon": "📚",
-        "category": AchievementCategory.ENGAGEMENT,
-        "points": 40,
-        "criteria": {"type": "questions_asked", "count": 50}
-    },
-    {
-        "name": "Training Champion",
-        "name_ar": "بطل التدريب",
-        "description": "Complete all training modules",
-        "description_ar": "أكمل جميع وحدات التدريب",
-        "icon": "🎓",
-        "category": AchievementCategory.LEARNING,
-        "points": 75,
-        "criteria": {"type": "all_training_completed"}
-    },
-    {
-        "name": "Perfect Score",
-        "name_ar": "النتيجة المثالية",
-        "description": "Score 100% on a training quiz",
-        "description_ar": "احصل على 100% في اختبار تدريبي",
-        "icon": "💯",
-        "category": AchievementCategory.LEARNING,
-        "points": 30,
-        "criteria": {"type": "quiz_perfect_score"}
-    },
-    {
-        "name": "Feedback Helper",
-        "name_ar": "مساعد الملاحظات",
-        "description": "Provide feedback on 5 responses",
-        "description_ar": "قدم ملاحظات على 5 ردود",
-        "icon": "👍",
-        "category": AchievementCategory.ENGAGEMENT,
-        "points": 20,
-        "criteria": {"type": "feedback_given", "count": 5}
-    },
-    {
-        "name": "Early Bird",
-        "name_ar": "الطائر المبكر",
-        "description": "Complete a task before its due date",
-        "description_ar": "أكمل مهمة قبل موعدها",
-        "icon": "🌅",
-        "category": AchievementCategory.SPEED,
-        "points": 15,
-        "criteria": {"type": "early_completion"}
-    },
-    {
-        "name": "Streak Starter",
-        "name_ar": "بداية السلسلة",
-        "description": "Log in 3 days in a row",
-        "description_ar": "سجل دخولك 3 أيام متتالية",
-        "icon": "🔥",
-        "category": AchievementCategory.ENGAGEMENT,
-        "points": 20,
-        "criteria": {"type": "login_streak", "days": 3}
-    },
-    {
-        "name": "Dedicated",
-        "name_ar": "مُلتزم",
-        "description": "Log in 7 days in a row",
-        "description_ar": "سجل دخولك 7 أيام متتالية",
-        "icon": "💪",
-        "category": AchievementCategory.ENGAGEMENT,
-        "points": 50,
-        "criteria": {"type": "login_streak", "days": 7}
-    },
-]
+DEFAULT_ACHIEVEMENTS: Tuple[_DefaultAchievement, ...] = (
+    _DefaultAchievement(
+        name="First Steps",
+        name_ar="الخطوات الأولى",
+        description="Complete your first onboarding task",
+        description_ar="أكمل مهمة الإعداد الأولى",
+        icon="🎯",
+        category=AchievementCategory.ONBOARDING,
+        points=10,
+        criteria={"type": "tasks_completed", "count": 1}
+    ),
+    _DefaultAchievement(
+        name="Getting Started",
+        name_ar="البداية",
+        description="Complete 5 onboarding tasks",
+        description_ar="أكمل 5 مهام إعداد",
+        icon="⭐",
+        category=AchievementCategory.ONBOARDING,
+        points=25,
+        criteria={"type": "tasks_completed", "count": 5}
+    ),
+    _DefaultAchievement(
+        name="Onboarding Pro",
+        name_ar="محترف الإعداد",
+        description="Complete all onboarding tasks",
+        description_ar="أكمل جميع مهام الإعداد",
+        icon="🏆",
+        category=AchievementCategory.ONBOARDING,
+        points=100,
+        criteria={"type": "all_tasks_completed"}
+    ),
+    _DefaultAchievement(
+        name="Quick Learner",
+        name_ar="سريع التعلم",
+        description="Complete onboarding within first week",
+        description_ar="أكمل الإعداد خلال الأسبوع الأول",
+        icon="⚡",
+        category=AchievementCategory.SPEED,
+        points=50,
+        criteria={"type": "onboarding_speed", "days": 7}
+    ),
+    _DefaultAchievement(
+        name="Curious Mind",
+        name_ar="عقل فضولي",
+        description="Ask 10 questions to the assistant",
+        description_ar="اسأل 10 أسئلة للمساعد",
+        icon="❓",
+        category=AchievementCategory.ENGAGEMENT,
+        points=15,
+        criteria={"type": "questions_asked", "count": 10}
+    ),
+    _DefaultAchievement(
+        name="Knowledge Seeker",
+        name_ar="باحث عن المعرفة",
+        description="Ask 50 questions to the assistant",
+        description_ar="اسأل 50 سؤالاً للمساعد",
+        icon="📚",
+        category=AchievementCategory.ENGAGEMENT,
+        points=40,
+        criteria={"type": "questions_asked", "count": 50}
+    ),
+    _DefaultAchievement(
+        name="Training Champion",
+        name_ar="بطل التدريب",
+        description="Complete all training modules",
+        description_ar="أكمل جميع وحدات التدريب",
+        icon="🎓",
+        category=AchievementCategory.LEARNING,
+        points=75,
+        criteria={"type": "all_training_completed"}
+    ),
+    _DefaultAchievement(
+        name="Perfect Score",
+        name_ar="النتيجة المثالية",
+        description="Score 100% on a training quiz",
+        description_ar="احصل على 100% في اختبار تدريبي",
+        icon="💯",
+        category=AchievementCategory.LEARNING,
+        points=30,
+        criteria={"type": "quiz_perfect_score"}
+    ),
+    _DefaultAchievement(
+        name="Feedback Helper",
+        name_ar="مساعد الملاحظات",
+        description="Provide feedback on 5 responses",
+        description_ar="قدم ملاحظات على 5 ردود",
+        icon="👍",
+        category=AchievementCategory.ENGAGEMENT,
+        points=20,
+        criteria={"type": "feedback_given", "count": 5}
+    ),
+    _DefaultAchievement(
+        name="Early Bird",
+        name_ar="الطائر المبكر",
+        description="Complete a task before its due date",
+        description_ar="أكمل مهمة قبل موعدها",
+        icon="🌅",
+        category=AchievementCategory.SPEED,
+        points=15,
+        criteria={"type": "early_completion"}
+    ),
+    _DefaultAchievement(
+        name="Streak Starter",
+        name_ar="بداية السلسلة",
+        description="Log in 3 days in a row",
+        description_ar="سجل دخولك 3 أيام متتالية",
+        icon="🔥",
+        category=AchievementCategory.ENGAGEMENT,
+        points=20,
+        criteria={"type": "login_streak", "days": 3}
+    ),
+    _DefaultAchievement(
+        name="Dedicated",
+        name_ar="مُلتزم",
+        description="Log in 7 days in a row",
+        description_ar="سجل دخولك 7 أيام متتالية",
+        icon="💪",
+        category=AchievementCategory.ENGAGEMENT,
+        points=50,
+        criteria={"type": "login_streak", "days": 7}
+    ),
+)
 
 
 class AchievementService:
@@ -145,163 +185,244 @@ class AchievementService:
     
     def initialize_achievements(self):
         """Initialize default achievements if not exist."""
-        for ach_data in DEFAULT_ACHIEVEMENTS:
-            existing = self.db.query(Achievement).filter(
-                Achievement.name == ach_data["name"]
-            ).first()
-            
-            if not existing:
-                achievement = Achievement(**ach_data)
-                self.db.add(achievement)
+        names = [ach_data.name for ach_data in DEFAULT_ACHIEVEMENTS]
+        existing = {
+            name for (name,) in self.db.query(Achievement.name).filter(
+                Achievement.name.in_(names)
+            )
+        }
+        missing = [
+            asdict(ach_data) for ach_data in DEFAULT_ACHIEVEMENTS
+            if ach_data.name not in existing
+        ]
         
-        self.db.commit()
+        if missing:
+            # One executemany INSERT; Core fills column defaults per row
+            self.db.execute(insert(Achievement.__table__), missing)
+            self.db.commit()
+            invalidate_achievement_cache()
         logger.info("Default achievements initialized")
     
     def check_and_unlock(self, user_id: int) -> List[Achievement]:
         """Check and unlock achievements for a user."""
-        unlocked = []
         user = self.db.query(User).filter(User.id == user_id).first()
         
         if not user:
-            return unlocked
+            return []
         
-        achievements = self.db.query(Achievement).filter(
-            Achievement.is_active == True
-        ).all()
+        # All of the user's progress rows in one query; the criteria come
+        # from the definition cache, so skip the eager achievement join
+        user_achievements = {
+            ua.achievement_id: ua
+            for ua in self.db.query(UserAchievement).options(
+                lazyload(UserAchievement.achievement)
+            ).filter(
+                UserAchievement.user_id == user_id
+            )
+        }
         
-        for achievement in achievements:
-            # Skip if already unlocked
-            existing = self.db.query(UserAchievement).filter(
-                UserAchievement.user_id == user_id,
-                UserAchievement.achievement_id == achievement.id,
-                UserAchievement.progress >= 100
-            ).first()
-            
-            if existing:
-                continue
+        # Group the achievements not yet unlocked by criterion type
+        pending = defaultdict(list)
+        for achievement_id, criteria in self._load_active_achievements():
+            if not (
+                achievement_id in user_achievements
+                and user_achievements[achievement_id].progress >= 100
+            ):
+                pending[criteria.get("type")].append((achievement_id, criteria))
+        if not pending:
+            return []
+        
+        # Only the aggregates some pending criterion type needs
+        stats = self._user_stats(user, pending.keys())
+        unlocked_ids = []
+        
+        for achievements in pending.values():
+            for achievement_id, criteria in achievements:
+                # Check criteria; only achievements still in progress need a
+                # percentage
+                user_achievement = user_achievements.get(achievement_id)
+                
+                if self._is_complete(criteria, stats):
+                    self._unlock_achievement(user_id, achievement_id, user_achievement)
+                    unlocked_ids.append(achievement_id)
+                else:
+                    # Update partial progress
+                    progress = self._calculate_progress(criteria, stats)
+                    self._update_progress(user_id, achievement_id, progress, user_achievement)
+        
+        # One transaction for every staged row
+        self.db.commit()
+        if not unlocked_ids:
+            return []
+        
+        # Report unlocks in definition order, as before grouping
+        unlocked_ids.sort()
+        for achievement_id in unlocked_ids:
+            logger.info(f"Achievement unlocked: user={user_id}, achievement={achievement_id}")
+        achievements = {
+            achievement.id: achievement
+            for achievement in self.db.query(Achievement).filter(
+                Achievement.id.in_(unlocked_ids)
+            )
+        }
+        if len(achievements) < len(unlocked_ids):
+            # The cached definitions name rows this database doesn't have
+            # (deleted, or cached from another database); reload next time
+            invalidate_achievement_cache()
+        return [
+            achievements[achievement_id] for achievement_id in unlocked_ids
+            if achievement_id in achievements
+        ]
+    
+    def _load_active_achievements(self) -> List[Tuple[int, Dict]]:
+        """Active achievements as ``(id, criteria)`` pairs, cached process-wide."""
+        with _active_achievements_lock:
+            cached = _active_achievements.get(_ACTIVE_KEY)
+        if cached is not None:
+            return cached
+        
+        cached = [
+            (achievement_id, criteria)
+            for achievement_id, criteria in self.db.query(
+                Achievement.id, Achievement.criteria
+            ).filter(
+                Achievement.is_active == True
+            ).order_by(Achievement.id)
+        ]
+        with _active_achievements_lock:
+            _active_achievements[_ACTIVE_KEY] = cached
+        return cached
+    
+    def _user_stats(self, user: User, criteria_types: Iterable[str]) -> Dict[str, Any]:
+        """Collect the figures the given criterion types need.
+        
+        Activity counts come from counters on the user row; the rest is one
+        aggregate query per table, run only when a criterion type uses it.
+        """
+        user_id = user.id
+        criteria_types = set(criteria_types)
+        stats = {
+            "start_date": user.start_date,
+            "questions": user.questions_asked_count,
+            "feedback": user.feedback_given_count,
+            "login_streak": user.login_streak_days,
+        }
+        
+        if not _TASK_CRITERIA.isdisjoint(criteria_types):
+            tasks = self._task_summary(user_id)
+            stats.update(
+                tasks_total=tasks.total,
+                tasks_done=tasks.done,
+                tasks_early=tasks.early,
+                last_task_completed_at=tasks.last_done,
+            )
+        
+        if not _TRAINING_CRITERIA.isdisjoint(criteria_types):
+            training = self.db.query(
+                func.count(TrainingProgress.id).filter(TrainingProgress.status == "completed"),
+                func.count(TrainingProgress.id).filter(TrainingProgress.score == 100)
+            ).filter(TrainingProgress.user_id == user_id).one()
             
-            # Check criteria
-            progress = self._calculate_progress(user_id, achievement.criteria)
+            total_modules = self.db.query(func.count(TrainingModule.id)).filter(
+                TrainingModule.is_active == True
+            ).scalar()
             
-            if progress >= 100:
-                self._unlock_achievement(user_id, achievement.id)
-                unlocked.append(achievement)
-            else:
-                # Update partial progress
-                self._update_progress(user_id, achievement.id, progress)
-        
-        return unlocked
+            stats.update(
+                training_completed=training[0],
+                training_perfect=training[1],
+                training_total=total_modules,
+            )
+        
+        return stats
     
-    def _calculate_progress(self, user_id: int, criteria: Dict) -> float:
-        """Calculate achievement progress based on criteria."""
+    def _task_summary(self, user_id: int):
+        """Task totals for a user in one pass over their tasks.
+        
+        Returns a row with ``total``, ``done``, ``early`` (done before the
+        due date) and ``last_done`` (latest completion time).
+        """
+        task_done = Task.status == TaskStatus.DONE
+        return self.db.query(
+            func.count(Task.id).label("total"),
+            func.count(Task.id).filter(task_done).label("done"),
+            func.count(Task.id).filter(
+                and_(task_done, Task.completed_at < Task.due_date)
+            ).label("early"),
+            func.max(Task.completed_at).filter(task_done).label("last_done")
+        ).filter(Task.user_id == user_id).one()
+    
+    def _criterion_counts(self, criteria: Dict, stats: Dict[str, Any]) -> Tuple[int, int]:
+        """Reduce a criterion to integer ``(current, target)`` counts.
+        
+        The achievement is complete once ``current >= target``; yes/no
+        criteria count as ``(1, 1)`` or ``(0, 1)``.
+        """
         criteria_type = criteria.get("type")
         
         if criteria_type == "tasks_completed":
-            count = self.db.query(Task).filter(
-                Task.user_id == user_id,
-                Task.status == TaskStatus.DONE
-            ).count()
-            target = criteria.get("count", 1)
-            return min(100, (count / target) * 100)
+            return stats["tasks_done"], criteria.get("count", 1)
         
         elif criteria_type == "all_tasks_completed":
-            total = self.db.query(Task).filter(Task.user_id == user_id).count()
-            done = self.db.query(Task).filter(
-                Task.user_id == user_id,
-                Task.status == TaskStatus.DONE
-            ).count()
+            total = stats["tasks_total"]
             if total == 0:
-                return 0
-            return 100 if done == total else (done / total) * 100
+                return 0, 1
+            return stats["tasks_done"], total
         
         elif criteria_type == "questions_asked":
-            count = self.db.query(Message).filter(
-                Message.user_id == user_id,
-                Message.source == "user"
-            ).count()
-            target = criteria.get("count", 1)
-            return min(100, (count / target) * 100)
+            return stats["questions"], criteria.get("count", 1)
         
         elif criteria_type == "onboarding_speed":
-            user = self.db.query(User).filter(User.id == user_id).first()
-            if not user:
-                return 0
-            
             # Check if all tasks completed
-            total = self.db.query(Task).filter(Task.user_id == user_id).count()
-            done = self.db.query(Task).filter(
-                Task.user_id == user_id,
-                Task.status == TaskStatus.DONE
-            ).count()
-            
-            if done != total or total == 0:
-                return 0
+            total = stats["tasks_total"]
+            if stats["tasks_done"] != total or total == 0:
+                return 0, 1
             
             # Check if completed within time limit
-            last_task = self.db.query(Task).filter(
-                Task.user_id == user_id,
-                Task.status == TaskStatus.DONE
-            ).order_by(Task.completed_at.desc()).first()
-            
-            if last_task and last_task.completed_at:
-                days = (last_task.completed_at.date() - user.start_date).days
-                target_days = criteria.get("days", 7)
-                return 100 if days <= target_days else 0
+            last_completed_at = stats["last_task_completed_at"]
+            if last_completed_at:
+                days = (last_completed_at.date() - stats["start_date"]).days
+                return int(days <= criteria.get("days", 7)), 1
             
-            return 0
+            return 0, 1
         
         elif criteria_type == "all_training_completed":
-            from app.database.models import TrainingModule
-            total_modules = self.db.query(TrainingModule).filter(
-                TrainingModule.is_active == True
-            ).count()
-            
-            completed = self.db.query(TrainingProgress).filter(
-                TrainingProgress.user_id == user_id,
-                TrainingProgress.status == "completed"
-            ).count()
-            
+            total_modules = stats["training_total"]
             if total_modules == 0:
-                return 0
-            return 100 if completed >= total_modules else (completed / total_modules) * 100
+                return 0, 1
+            return stats["training_completed"], total_modules
         
         elif criteria_type == "quiz_perfect_score":
-            perfect = self.db.query(TrainingProgress).filter(
-                TrainingProgress.user_id == user_id,
-                TrainingProgress.score == 100
-            ).first()
-            return 100 if perfect else 0
+            return min(stats["training_perfect"], 1), 1
         
         elif criteria_type == "early_completion":
-            early = self.db.query(Task).filter(
-                Task.user_id == user_id,
-                Task.status == TaskStatus.DONE,
-                Task.completed_at < Task.due_date
-            ).first()
-            return 100 if early else 0
+            return min(stats["tasks_early"], 1), 1
         
         elif criteria_type == "feedback_given":
-            from app.database.models import Feedback
-            count = self.db.query(Feedback).filter(
-                Feedback.user_id == user_id
-            ).count()
-            target = criteria.get("count", 1)
-            return min(100, (count / target) * 100)
+            return stats["feedback"], criteria.get("count", 1)
         
         elif criteria_type == "login_streak":
-            # Would need login history tracking
-            # Simplified: return 0 for now
-            return 0
+            return stats["login_streak"], criteria.get("days", 1)
         
-        return 0
+        return 0, 1
     
-    def _unlock_achievement(self, user_id: int, achievement_id: int):
-        """Unlock an achievement for a user."""
-        user_achievement = self.db.query(UserAchievement).filter(
-            UserAchievement.user_id == user_id,
-            UserAchievement.achievement_id == achievement_id
-        ).first()
-        
+    def _is_complete(self, criteria: Dict, stats: Dict[str, Any]) -> bool:
+        """Whether a criterion is met, by integer comparison only."""
+        current, target = self._criterion_counts(criteria, stats)
+        return current >= target
+    
+    def _calculate_progress(self, criteria: Dict, stats: Dict[str, Any]) -> float:
+        """Calculate achievement progress (0-100) based on criteria."""
+        current, target = self._criterion_counts(criteria, stats)
+        return 100.0 if current >= target else current * 100.0 / target
+    
+    def _unlock_achievement(
+        self,
+        user_id: int,
+        achievement_id: int,
+        user_achievement: Optional[UserAchievement]
+    ):
+        """Stage unlocking an achievement, given the user's existing progress
+        row. The caller commits."""
         if user_achievement:
             user_achievement.progress = 100
             user_achievement.unlocked_at = datetime.utcnow()
@@ -313,17 +434,16 @@ class AchievementService:
                 unlocked_at=datetime.utcnow()
             )
             self.db.add(user_achievement)
-        
-        self.db.commit()
-        logger.info(f"Achievement unlocked: user={user_id}, achievement={achievement_id}")
     
-    def _update_progress(self, user_id: int, achievement_id: int, progress: float):
-        """Update partial progress for an achievement."""
-        user_achievement = self.db.query(UserAchievement).filter(
-            UserAchievement.user_id == user_id,
-            UserAchievement.achievement_id == achievement_id
-        ).first()
-        
+    def _update_progress(
+        self,
+        user_id: int,
+        achievement_id: int,
+        progress: float,
+        user_achievement: Optional[UserAchievement]
+    ):
+        """Stage partial progress for an achievement, given the existing row.
+        The caller commits."""
         if user_achievement:
             if progress > user_achievement.progress:
                 user_achievement.progress = progress
@@ -334,30 +454,25 @@ class AchievementService:
                 progress=progress
             )
             self.db.add(user_achievement)
-        
-        self.db.commit()
     
     def get_user_achievements(self, user_id: int, include_locked: bool = False) -> List[Dict]:
         """Get achievements for a user."""
+        # One query: each achievement with the user's progress row, if any
+        query = self.db.query(Achievement, UserAchievement).outerjoin(
+            UserAchievement,
+            and_(
+                UserAchievement.achievement_id == Achievement.id,
+                UserAchievement.user_id == user_id
+            )
+        ).options(lazyload(UserAchievement.achievement))
+        
         if include_locked:
-            achievements = self.db.query(Achievement).filter(
-                Achievement.is_active == True
-            ).all()
+            query = query.filter(Achievement.is_active == True)
         else:
-            achievements = self.db.query(Achievement).join(
-                UserAchievement
-            ).filter(
-                UserAchievement.user_id == user_id,
-                UserAchievement.progress >= 100
-            ).all()
+            query = query.filter(UserAchievement.progress >= 100)
         
         result = []
-        for ach in achievements:
-            user_ach = self.db.query(UserAchievement).filter(
-                UserAchievement.user_id == user_id,
-                UserAchievement.achievement_id == ach.id
-            ).first()
-            
+        for ach, user_ach in query.all():
             result.append({
                 "id": ach.id,
                 "name": ach.name,
@@ -375,42 +490,29 @@ class AchievementService:
         return result
     
     def get_user_points(self, user_id: int) -> int:
-        """Get total points for a user."""
-        result = self.db.query(
-            func.sum(Achievement.points)
-        ).join(
-            UserAchievement
-        ).filter(
-            UserAchievement.user_id == user_id,
-            UserAchievement.progress >= 100
-        ).scalar()
+        """Get total points for a user (maintained on ``User.total_points``)."""
+        result = self.db.query(User.total_points).filter(User.id == user_id).scalar()
         
         return result or 0
     
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
-        """Get achievement leaderboard."""
+        """Get achievement leaderboard (one indexed top-N read of ``users``)."""
         results = self.db.query(
             User.id,
             User.name,
-            func.sum(Achievement.points).label("total_points"),
-            func.count(UserAchievement.id).label("achievement_count")
-        ).join(
-            UserAchievement, User.id == UserAchievement.user_id
-        ).join(
-            Achievement
+            User.total_points,
+            User.achievement_count
         ).filter(
-            UserAchievement.progress >= 100
-        ).group_by(
-            User.id
+            User.achievement_count > 0
         ).order_by(
-            func.sum(Achievement.points).desc()
+            User.total_points.desc()
         ).limit(limit).all()
         
         return [
             {
                 "user_id": r.id,
                 "name": r.name,
-                "total_points": r.total_points or 0,
+                "total_points": r.total_points,
                 "achievement_count": r.achievement_count
             }
             for r in results
@@ -418,8 +520,11 @@ class AchievementService:
     
     def get_unnotified_achievements(self, user_id: int) -> List[Dict]:
         """Get achievements that user hasn't been notified about."""
+        # The explicit join doubles as the eager load of ``achievement``
         user_achievements = self.db.query(UserAchievement).join(
             Achievement
+        ).options(
+            contains_eager(UserAchievement.achievement)
         ).filter(
             UserAchievement.user_id == user_id,
             UserAchievement.progress >= 100,
@@ -437,8 +542,11 @@ class AchievementService:
                 "points": ua.achievement.points,
                 "unlocked_at": ua.unlocked_at.isoformat()
             })
-            ua.is_notified = True
         
-        self.db.commit()
+        if user_achievements:
+            # One UPDATE for the rows returned above (not any unlocked since)
+            self.db.query(UserAchievement).filter(
+                UserAchievement.id.in_([ua.id for ua in user_achievements])
+            ).update({"is_notified": True}, synchronize_session=False)
+            self.db.commit()
         return result
-
@@ -6,14 +6,37 @@ integration (Google Calendar, Microsoft Outlook), see:
 """
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from itertools import chain
+from typing import Iterator, List, Optional, Dict, Any
+from urllib.parse import urlencode
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, exists, insert
 
 from app.database.models import CalendarEvent, Task, TrainingModule, User
+from app.database.timestamps import minutes_before
 
 logger = logging.getLogger(__name__)
 
+ICAL_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+
+GOOGLE_CALENDAR_RENDER_URL = "https://calendar.google.com/calendar/render"
+OUTLOOK_COMPOSE_URL = "https://outlook.office.com/calendar/0/deeplink/compose"
+
+# Subscription feed served by the API (host as configured for webcal links)
+CALENDAR_FEED_PATH = "/api/v1/calendar/feed"
+CALENDAR_FEED_HOST = "your-domain"
+
+# RFC 5545 TEXT escaping
+_ICAL_ESCAPE = str.maketrans({"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n"})
+
+_ICAL_HEADER = (
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//Onboarding Copilot//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+)
+
 
 class CalendarService:
     """Service for calendar integration and event management."""
@@ -108,30 +131,45 @@ class CalendarService:
     
     def sync_tasks_to_calendar(self, user_id: int) -> List[CalendarEvent]:
         """Create calendar events for all user tasks."""
-        tasks = self.db.query(Task).filter(
-            Task.user_id == user_id
+        # Tasks that do not have an event yet, in one query
+        has_event = exists().where(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.task_id == Task.id
+        )
+        tasks = self.db.query(
+            Task.id, Task.title, Task.description, Task.due_date
+        ).filter(
+            Task.user_id == user_id,
+            ~has_event
         ).all()
         
-        created_events = []
+        if not tasks:
+            logger.info(f"Synced 0 tasks to calendar for user {user_id}")
+            return []
         
+        rows = []
         for task in tasks:
-            # Check if event already exists for this task
-            existing = self.db.query(CalendarEvent).filter(
-                CalendarEvent.user_id == user_id,
-                CalendarEvent.task_id == task.id
-            ).first()
-            
-            if not existing:
-                event = self.create_event(
-                    user_id=user_id,
-                    title=f"📋 {task.title}",
-                    description=task.description,
-                    start_time=datetime.combine(task.due_date, datetime.min.time()),
-                    all_day=True,
-                    task_id=task.id,
-                    reminder_minutes=1440  # 1 day before
-                )
-                created_events.append(event)
+            start_time = datetime.combine(task.due_date, datetime.min.time())
+            rows.append({
+                "user_id": user_id,
+                "title": f"📋 {task.title}",
+                "description": task.description,
+                "start_time": start_time,
+                "end_time": start_time + timedelta(hours=1),
+                "all_day": True,
+                "task_id": task.id,
+                "reminder_minutes": 1440  # 1 day before
+            })
+        
+        # One batched INSERT and one transaction for all new events
+        event_ids = self.db.scalars(
+            insert(CalendarEvent).returning(CalendarEvent.id), rows
+        ).all()
+        self.db.commit()
+        
+        created_events = self.db.query(CalendarEvent).filter(
+            CalendarEvent.id.in_(event_ids)
+        ).order_by(CalendarEvent.id).all()
         
         logger.info(f"Synced {len(created_events)} tasks to calendar for user {user_id}")
         return created_events
@@ -140,114 +178,122 @@ class CalendarService:
         """Get events with reminders due in the next X minutes."""
         now = datetime.utcnow()
         
-        events = self.db.query(CalendarEvent).filter(
+        # Due-reminder filter runs in SQL; names/emails come from the join
+        rows = self.db.query(
+            CalendarEvent, User.email, User.name
+        ).outerjoin(
+            User, User.id == CalendarEvent.user_id
+        ).filter(
             CalendarEvent.is_reminder_sent == False,
-            CalendarEvent.start_time > now
+            CalendarEvent.start_time > now,
+            minutes_before(CalendarEvent.start_time, CalendarEvent.reminder_minutes) <= now
         ).all()
         
-        reminders_due = []
-        
-        for event in events:
-            reminder_time = event.start_time - timedelta(minutes=event.reminder_minutes)
-            if now >= reminder_time and now < event.start_time:
-                user = self.db.query(User).filter(User.id == event.user_id).first()
-                reminders_due.append({
-                    "event_id": event.id,
-                    "user_id": event.user_id,
-                    "user_email": user.email if user else None,
-                    "user_name": user.name if user else None,
-                    "title": event.title,
-                    "description": event.description,
-                    "start_time": event.start_time.isoformat(),
-                    "minutes_until": int((event.start_time - now).total_seconds() / 60)
-                })
-        
-        return reminders_due
+        return [
+            {
+                "event_id": event.id,
+                "user_id": event.user_id,
+                "user_email": user_email,
+                "user_name": user_name,
+                "title": event.title,
+                "description": event.description,
+                "start_time": event.start_time.isoformat(),
+                "minutes_until": int((event.start_time - now).total_seconds() / 60)
+            }
+            for event, user_email, user_name in rows
+        ]
     
     def mark_reminder_sent(self, event_id: int):
         """Mark a reminder as sent."""
-        event = self.get_event(event_id)
-        if event:
-            event.is_reminder_sent = True
-            self.db.commit()
+        self.mark_reminders_sent([event_id])
+    
+    def mark_reminders_sent(self, event_ids: List[int]):
+        """Mark the reminders of several events as sent in one UPDATE."""
+        if not event_ids:
+            return
+        self.db.query(CalendarEvent).filter(
+            CalendarEvent.id.in_(event_ids)
+        ).update({"is_reminder_sent": True}, synchronize_session=False)
+        self.db.commit()
     
     def generate_ical(self, user_id: int) -> str:
         """Generate iCal format for user's events."""
         events = self.get_events(user_id, include_past=False)
         
-        lines = [
-            "BEGIN:VCALENDAR",
-            "VERSION:2.0",
-            "PRODID:-//Onboarding Copilot//EN",
-            "CALSCALE:GREGORIAN",
-            "METHOD:PUBLISH"
-        ]
+        # One DTSTAMP for the whole feed
+        dtstamp = datetime.utcnow().strftime(ICAL_TIME_FORMAT)
         
-        for event in events:
-            lines.extend([
-                "BEGIN:VEVENT",
-                f"UID:{event.id}@onboarding-copilot",
-                f"DTSTAMP:{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}",
-                f"DTSTART:{event.start_time.strftime('%Y%m%dT%H%M%SZ')}",
-                f"DTEND:{(event.end_time or event.start_time + timedelta(hours=1)).strftime('%Y%m%dT%H%M%SZ')}",
-                f"SUMMARY:{event.title}",
-            ])
-            
-            if event.description:
-                lines.append(f"DESCRIPTION:{event.description.replace(chr(10), '\\n')}")
-            
-            if event.reminder_minutes > 0:
-                lines.extend([
-                    "BEGIN:VALARM",
-                    "ACTION:DISPLAY",
-                    f"TRIGGER:-PT{event.reminder_minutes}M",
-                    f"DESCRIPTION:Reminder: {event.title}",
-                    "END:VALARM"
-                ])
-            
-            lines.append("END:VEVENT")
-        
-        lines.append("END:VCALENDAR")
-        
-        return "\r\n".join(lines)
+        return "\r\n".join(chain(
+            _ICAL_HEADER,
+            chain.from_iterable(self._ical_event_lines(event, dtstamp) for event in events),
+            ("END:VCALENDAR",)
+        ))
+    
+    @staticmethod
+    def _ical_event_lines(event: CalendarEvent, dtstamp: str) -> Iterator[str]:
+        """Yield the VEVENT lines for one event."""
+        title = event.title.translate(_ICAL_ESCAPE)
+        end_time = event.end_time or event.start_time + timedelta(hours=1)
+        
+        yield "BEGIN:VEVENT"
+        yield f"UID:{event.id}@onboarding-copilot"
+        yield f"DTSTAMP:{dtstamp}"
+        yield f"DTSTART:{event.start_time.strftime(ICAL_TIME_FORMAT)}"
+        yield f"DTEND:{end_time.strftime(ICAL_TIME_FORMAT)}"
+        yield f"SUMMARY:{title}"
+        
+        if event.description:
+            yield f"DESCRIPTION:{event.description.translate(_ICAL_ESCAPE)}"
+        
+        if event.reminder_minutes > 0:
+            yield "BEGIN:VALARM"
+            yield "ACTION:DISPLAY"
+            yield f"TRIGGER:-PT{event.reminder_minutes}M"
+            yield f"DESCRIPTION:Reminder: {title}"
+            yield "END:VALARM"
+        
+        yield "END:VEVENT"
     
     def generate_google_calendar_url(self, event: CalendarEvent) -> str:
         """Generate Google Calendar add event URL."""
-        base_url = "https://calendar.google.com/calendar/render?action=TEMPLATE"
-        
-        params = [
-            f"text={event.title}",
-            f"dates={event.start_time.strftime('%Y%m%dT%H%M%SZ')}/{(event.end_time or event.start_time + timedelta(hours=1)).strftime('%Y%m%dT%H%M%SZ')}"
-        ]
+        end_time = event.end_time or event.start_time + timedelta(hours=1)
+        params = {
+            "action": "TEMPLATE",
+            "text": event.title,
+            "dates": f"{event.start_time.strftime(ICAL_TIME_FORMAT)}/{end_time.strftime(ICAL_TIME_FORMAT)}"
+        }
         
         if event.description:
-            params.append(f"details={event.description}")
+            params["details"] = event.description
         
-        return f"{base_url}&{'&'.join(params)}"
+        return f"{GOOGLE_CALENDAR_RENDER_URL}?{urlencode(params)}"
     
     def generate_outlook_calendar_url(self, event: CalendarEvent) -> str:
         """Generate Outlook Calendar add event URL."""
-        base_url = "https://outlook.office.com/calendar/0/deeplink/compose"
-        
-        params = [
-            f"subject={event.title}",
-            f"startdt={event.start_time.isoformat()}",
-            f"enddt={(event.end_time or event.start_time + timedelta(hours=1)).isoformat()}"
-        ]
+        end_time = event.end_time or event.start_time + timedelta(hours=1)
+        params = {
+            "subject": event.title,
+            "startdt": event.start_time.isoformat(),
+            "enddt": end_time.isoformat()
+        }
         
         if event.description:
-            params.append(f"body={event.description}")
+            params["body"] = event.description
         
-        return f"{base_url}?{'&'.join(params)}"
+        return f"{OUTLOOK_COMPOSE_URL}?{urlencode(params)}"
     
     def get_calendar_feed_url(self, user_id: int, token: str) -> Dict[str, str]:
         """Get calendar feed URLs for external calendar apps."""
-        base_url = "/api/v1/calendar"
+        feed_path = f"{CALENDAR_FEED_PATH}/{user_id}?{urlencode({'token': token, 'format': 'ics'})}"
+        webcal_url = f"webcal://{CALENDAR_FEED_HOST}{feed_path}"
         
         return {
-            "ical": f"{base_url}/feed/{user_id}?token={token}&format=ics",
-            "google_calendar": f"https://calendar.google.com/calendar/r?cid=webcal://your-domain{base_url}/feed/{user_id}?token={token}&format=ics",
-            "outlook": f"https://outlook.office.com/owa/?path=/calendar/action/compose&rru=addsubscription&url=webcal://your-domain{base_url}/feed/{user_id}?token={token}&format=ics"
+            "ical": feed_path,
+            "google_calendar": f"https://calendar.google.com/calendar/r?{urlencode({'cid': webcal_url})}",
+            "outlook": (
+                "https://outlook.office.com/owa/?path=/calendar/action/compose&rru=addsubscription&"
+                f"{urlencode({'url': webcal_url})}"
+            )
         }
     
     def get_week_view(self, user_id: int, week_start: Optional[datetime] = None) -> Dict[str, List[Dict]]:
@@ -261,24 +307,31 @@ class CalendarService:
         
         week_end = week_start + timedelta(days=7)
         
-        events = self.get_events(
-            user_id,
-            start_date=week_start,
-            end_date=week_end,
-            include_past=True
-        )
-        
-        # Organize by day
-        days = {}
-        for i in range(7):
-            day = week_start + timedelta(days=i)
-            day_str = day.strftime("%Y-%m-%d")
-            days[day_str] = []
+        # Plain rows of the displayed columns; no ORM objects for a read-only view
+        events = self.db.query(
+            CalendarEvent.id,
+            CalendarEvent.title,
+            CalendarEvent.description,
+            CalendarEvent.start_time,
+            CalendarEvent.end_time,
+            CalendarEvent.all_day,
+            CalendarEvent.task_id
+        ).filter(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.start_time >= week_start,
+            CalendarEvent.start_time <= week_end
+        ).order_by(CalendarEvent.start_time).all()
+        
+        # Organize by day: bucket by day offset from the week start, and
+        # format each day's key once
+        week_start_date = week_start.date()
+        buckets: List[List[Dict]] = [[] for _ in range(7)]
+        now = datetime.utcnow()
         
         for event in events:
-            day_str = event.start_time.strftime("%Y-%m-%d")
-            if day_str in days:
-                days[day_str].append({
+            index = (event.start_time.date() - week_start_date).days
+            if 0 <= index < 7:
+                buckets[index].append({
                     "id": event.id,
                     "title": event.title,
                     "description": event.description,
@@ -286,8 +339,12 @@ class CalendarService:
                     "end_time": event.end_time.isoformat() if event.end_time else None,
                     "all_day": event.all_day,
                     "task_id": event.task_id,
-                    "is_past": event.start_time < datetime.utcnow()
+                    "is_past": event.start_time < now
                 })
         
+        days = {
+            (week_start_date + timedelta(days=i)).isoformat(): bucket
+            for i, bucket in enumerate(buckets)
+        }
         return days
 
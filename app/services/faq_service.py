@@ -2,8 +2,10 @@
 import logging
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, cast, type_coerce, Text
+from sqlalchemy.dialects.postgresql import JSONB
 
+from app.database.connection import json_serializer
 from app.database.models import FAQ, Department
 
 logger = logging.getLogger(__name__)
@@ -108,6 +110,24 @@ class FAQService:
         
         return query.offset(offset).limit(limit).all()
     
+    def _tag_filter(self, tag: str):
+        """Filter for FAQs tagged with ``tag``.
+        
+        On PostgreSQL this is a jsonb containment test served by the GIN
+        index; elsewhere it matches the quoted tag in the stored JSON text,
+        encoded by the same serializer the engine stores it with and with
+        LIKE wildcards escaped.
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            return type_coerce(FAQ.tags, JSONB).contains([tag])
+        pattern = (
+            json_serializer(tag)
+            .replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_")
+        )
+        return cast(FAQ.tags, Text).like(f"%{pattern}%", escape="\\")
+    
     def search_faqs(
         self,
         query: str,
@@ -136,7 +156,7 @@ class FAQService:
         search_query = search_query.union(
             self.db.query(FAQ).filter(
                 FAQ.is_published == True,
-                FAQ.tags.contains([query.lower()])
+                self._tag_filter(query.lower())
             )
         )
         
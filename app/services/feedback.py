@@ -2,9 +2,10 @@
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 
+from app.database.loading import strict_load
 from app.database.models import Feedback, FeedbackType, Message, RoutingLog
 
 logger = logging.getLogger(__name__)
@@ -113,7 +114,7 @@ class FeedbackService:
     
     def get_feedback_for_retraining(self, limit: int = 1000) -> List[Dict[str, Any]]:
         """Get feedback data suitable for model retraining."""
-        feedback_data = self.db.query(Feedback).filter(
+        feedback_data = strict_load(self.db.query(Feedback)).filter(
             Feedback.routing_was_correct.isnot(None),
             Feedback.query_text.isnot(None)
         ).order_by(Feedback.created_at.desc()).limit(limit).all()
@@ -138,7 +139,9 @@ class FeedbackService:
     
     def get_recent_negative_feedback(self, limit: int = 50) -> List[Feedback]:
         """Get recent negative feedback for review."""
-        return self.db.query(Feedback).filter(
+        return strict_load(
+            self.db.query(Feedback), selectinload(Feedback.message)
+        ).filter(
             Feedback.feedback_type == FeedbackType.NOT_HELPFUL
         ).order_by(Feedback.created_at.desc()).limit(limit).all()
 
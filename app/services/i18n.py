@@ -1,15 +1,10 @@
 """Internationalization (i18n) service for Arabic and English support."""
 import logging
 from typing import Dict, Optional, Any
-from enum import Enum
-
-logger = logging.getLogger(__name__)
 
+from app.database.models import Language
 
-class Language(str, Enum):
-    """Supported languages."""
-    ENGLISH = "en"
-    ARABIC = "ar"
+logger = logging.getLogger(__name__)
 
 
 # Translation dictionaries
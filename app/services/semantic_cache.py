@@ -5,9 +5,9 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, literal, Float
 
-from app.database.models import SemanticCache
+from app.database.models import SemanticCache, HAS_PGVECTOR, EMBEDDING_DIM, HALFVEC
 
 logger = logging.getLogger(__name__)
 
@@ -32,13 +32,17 @@ class SemanticCacheService:
         """Normalize query for consistent hashing."""
         return query.lower().strip()
     
-    def _compute_hash(self, query: str) -> str:
-        """Compute SHA-256 hash of normalized query."""
+    def _compute_hash(self, query: str) -> bytes:
+        """Compute the raw SHA-256 digest of the normalized query."""
         normalized = self._normalize_query(query)
-        return hashlib.sha256(normalized.encode()).hexdigest()
+        return hashlib.sha256(normalized.encode()).digest()
     
     def _get_embedding(self, query: str) -> Optional[List[float]]:
-        """Get embedding for a query."""
+        """Get the L2-normalized embedding for a query.
+        
+        Unit-length vectors are stored and searched, so cosine similarity
+        reduces to an inner product.
+        """
         if not self.embedding_model:
             return None
         
@@ -47,9 +51,12 @@ class SemanticCacheService:
             return self._embeddings_cache[normalized].tolist()
         
         try:
-            embedding = self.embedding_model.embed_query(normalized)
-            self._embeddings_cache[normalized] = np.array(embedding)
-            return embedding
+            embedding = np.asarray(self.embedding_model.embed_query(normalized), dtype=np.float32)
+            norm = np.linalg.norm(embedding)
+            if norm > 0:
+                embedding /= norm
+            self._embeddings_cache[normalized] = embedding
+            return embedding.tolist()
         except Exception as e:
             logger.error(f"Error computing embedding: {e}")
             return None
@@ -60,6 +67,63 @@ class SemanticCacheService:
         b = np.array(vec2)
         return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
     
+    def _uses_vector_search(self) -> bool:
+        """Whether similarity search can run in the database via pgvector."""
+        return HAS_PGVECTOR and self.db.get_bind().dialect.name == "postgresql"
+    
+    def _find_similar_in_db(self, query_embedding: List[float], now: datetime):
+        """Find the nearest valid entry with pgvector's inner-product operator.
+        
+        Served by the HNSW index instead of scoring entries in Python. ``<#>``
+        returns the negated inner product, which for unit vectors is the
+        negated cosine similarity.
+        """
+        distance = SemanticCache.query_embedding.op("<#>", return_type=Float)(
+            literal(query_embedding, type_=HALFVEC(EMBEDDING_DIM))
+        )
+        row = self.db.query(SemanticCache, distance.label("distance")).filter(
+            and_(
+                SemanticCache.is_valid == True,
+                SemanticCache.expires_at > now,
+                SemanticCache.query_embedding.isnot(None)
+            )
+        ).order_by(distance).limit(1).first()
+        
+        if row is None:
+            return None, 0.0
+        
+        entry, negative_inner_product = row
+        return entry, -float(negative_inner_product)
+    
+    def _find_similar_in_python(self, query_embedding: List[float], now: datetime):
+        """Score recent valid entries in Python (fallback without pgvector)."""
+        cache_entries = self.db.query(SemanticCache).filter(
+            and_(
+                SemanticCache.is_valid == True,
+                SemanticCache.expires_at > now,
+                SemanticCache.query_embedding.isnot(None)
+            )
+        ).limit(100).all()
+        
+        best_match = None
+        best_similarity = 0.0
+        
+        for entry in cache_entries:
+            if entry.query_embedding:
+                try:
+                    similarity = self._cosine_similarity(
+                        query_embedding, 
+                        entry.query_embedding
+                    )
+                    if similarity > best_similarity:
+                        best_similarity = similarity
+                        best_match = entry
+                except Exception as e:
+                    logger.error(f"Error computing similarity: {e}")
+                    continue
+        
+        return best_match, best_similarity
+    
     def get_cached_response(self, query: str) -> Optional[Dict[str, Any]]:
         """Get cached response for a similar query."""
         query_hash = self._compute_hash(query)
@@ -91,33 +155,12 @@ class SemanticCacheService:
         if self.embedding_model:
             query_embedding = self._get_embedding(query)
             if query_embedding:
-                # Get recent valid cache entries
-                cache_entries = self.db.query(SemanticCache).filter(
-                    and_(
-                        SemanticCache.is_valid == True,
-                        SemanticCache.expires_at > now,
-                        SemanticCache.query_embedding.isnot(None)
-                    )
-                ).limit(100).all()
-                
-                best_match = None
-                best_similarity = 0.0
+                if self._uses_vector_search():
+                    best_match, best_similarity = self._find_similar_in_db(query_embedding, now)
+                else:
+                    best_match, best_similarity = self._find_similar_in_python(query_embedding, now)
                 
-                for entry in cache_entries:
-                    if entry.query_embedding:
-                        try:
-                            similarity = self._cosine_similarity(
-                                query_embedding, 
-                                entry.query_embedding
-                            )
-                            if similarity > best_similarity and similarity >= self.similarity_threshold:
-                                best_similarity = similarity
-                                best_match = entry
-                        except Exception as e:
-                            logger.error(f"Error computing similarity: {e}")
-                            continue
-                
-                if best_match:
+                if best_match and best_similarity >= self.similarity_threshold:
                     best_match.hit_count += 1
                     best_match.last_accessed = now
                     self.db.commit()
@@ -195,11 +238,15 @@ class SemanticCacheService:
         logger.info(f"Cache invalidated for department: {department or 'all'}")
     
     def cleanup_expired(self) -> int:
-        """Remove expired cache entries."""
+        """Remove expired cache entries.
+        
+        A single range DELETE on ``expires_at`` (BRIN-indexed on PostgreSQL);
+        intended to be run periodically by a scheduled job.
+        """
         now = datetime.utcnow()
         count = self.db.query(SemanticCache).filter(
             SemanticCache.expires_at < now
-        ).delete()
+        ).delete(synchronize_session=False)
         self.db.commit()
         
         logger.info(f"Cleaned up {count} expired cache entries")
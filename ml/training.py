@@ -18,7 +18,7 @@ import joblib
 import mlflow
 import mlflow.sklearn
 
-from app.config import get_settings
+from app.config import get_settings, ensure_directories
 
 logger = logging.getLogger(__name__)
 
@@ -255,6 +255,8 @@ def main():
     
     args = parser.parse_args()
     
+    ensure_directories(settings)
+    
     results = train_router_model(
         max_features=args.max_features,
         ngram_range=(args.ngram_min, args.ngram_max),
@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import List, Dict, Any
 from dataclasses import dataclass
 
-from app.config import get_settings
+from app.config import get_settings, ensure_directories
 from rag.retriever import RAGRetriever, get_rag_retriever
 
 logging.basicConfig(level=logging.INFO)
@@ -227,6 +227,8 @@ def main():
     parser.add_argument("--output", type=str, default="rag_eval_results.json", help="Output file")
     args = parser.parse_args()
     
+    ensure_directories(settings)
+    
     logger.info("Loading RAG retriever...")
     retriever = get_rag_retriever()
     
@@ -7,7 +7,7 @@ from pathlib import Path
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.config import get_settings
+from app.config import get_settings, ensure_directories
 from app.database import engine, Base
 from rag.ingestion import DocumentIngestion
 from ml.training import train_router_model
@@ -27,6 +27,8 @@ def main():
     logger.info("Initializing Enterprise Onboarding Copilot")
     logger.info("="*60)
     
+    ensure_directories(settings)
+    
     # Step 1: Create database tables
     logger.info("\n[1/3] Creating database tables...")
     try: